@@ -0,0 +1,44 @@
+"""Synthetic specs and records per constraint type, at arbitrary scale (deterministic per seed)."""
+from typing import Any, Dict, List
+import numpy as np
+from eq_proof.spec import Spec
+
+KINDS = ("bounds", "equality", "chain", "sum_leq", "simplex", "monotone", "units")
+
+def gen_spec(kind: str, n_vars: int) -> Spec:
+    v = [f"x{i}" for i in range(n_vars)]; units: Dict[str, str] = {}
+    if kind == "bounds":
+        cons = [{"type": "bounds", "var": x, "lower": 0.0, "upper": 1.0} for x in v]
+    elif kind in ("equality", "chain"):
+        # equality: disjoint linear pairs x_{2i} + x_{2i+1} = 1 (one small component each);
+        # chain: overlapping pairs x_i + x_{i+1} = 1 (one coupled component); half of them with solve_for
+        step = 2 if kind == "equality" else 1
+        cons = [dict({"type": "equality", "expr": f"Eq({v[i]} + {v[i+1]}, 1)", "symbols": [v[i], v[i+1]]}, **({"solve_for": v[i+1]} if i % (2 * step) else {}))
+                for i in range(0, n_vars - 1, step)]
+    elif kind == "sum_leq":  # groups of 10 under one shared cap
+        v = v + ["cap"]
+        cons = [{"type": "sum_leq", "vars": v[i:min(i + 10, n_vars)], "cap_var": "cap"} for i in range(0, n_vars, 10)]
+    elif kind == "simplex":
+        cons = [{"type": "bounds", "var": x, "lower": 0.0, "upper": 1.0} for x in v] + [{"type": "simplex", "vars": v}]
+    elif kind == "monotone":
+        cons = [{"type": "monotone", "vars": v}]
+    elif kind == "units":
+        units = {x: "J" for x in v}; cons = [{"type": "bounds", "var": x, "lower": 0.0, "upper": None} for x in v]
+    else:
+        raise ValueError(f"unknown kind {kind}")
+    return Spec(f"bench_{kind}_{n_vars}", "0.1", v, cons, [], [], units)
+
+def gen_records(spec: Spec, n_records: int, *, violate: float = 0.5, seed: int = 0) -> List[Dict[str, Any]]:
+    """`violate` is the fraction of records pushed outside the spec; the rest are already compliant."""
+    rng = np.random.default_rng(seed); kind = spec.name.split("_")[1]; n = len(spec.variables)
+    X = rng.uniform(0.0, 1.0, size=(n_records, n)); bad = rng.random(n_records) < violate
+    if kind == "simplex": X /= X.sum(axis=1, keepdims=True)
+    if kind == "monotone": X = np.sort(X, axis=1)
+    if kind == "equality": m = n // 2; X[:, 1:2 * m:2] = 1.0 - X[:, 0:2 * m:2]
+    if kind == "chain": X[:, 0::2] = X[:, :1]; X[:, 1::2] = 1.0 - X[:, :1]
+    if kind == "sum_leq": X[:, -1] = 10.0
+    X[bad] += rng.normal(0.0, 0.5, size=(int(bad.sum()), n))
+    names = spec.variables
+    if kind == "units":
+        return [{k: {"value": float(x), "unit": "kJ" if j % 2 else "eV"} for j, (k, x) in enumerate(zip(names, row))} for row in X.tolist()]
+    return [dict(zip(names, row)) for row in X.tolist()]
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Import-time benchmark for the entry points. Each statement runs in a fresh interpreter (best of
+--repeat, timed inside the process) and reports which heavy dependencies it pulled in:
+
+    python -m benchmarks.imports --out imports.json
+    python -m benchmarks.imports --check      # exit 1 if verify/attest load SymPy, NumPy or matplotlib
+"""
+import argparse, json, os, subprocess, sys
+
+HEAVY = ("sympy", "numpy", "matplotlib")
+ENTRY_POINTS = {  # name -> (statement, must stay free of HEAVY)
+    "eq_proof":          ("import eq_proof", True),
+    "eq_proof.verify":   ("import eq_proof.verify", True),
+    "eq_proof.attest":   ("import eq_proof.attest", True),
+    "verify_cli":        ("import verify_cli", True),
+    "cli":               ("import cli", True),
+    "eq_proof.diagnose": ("import eq_proof.diagnose", False),
+    "compile (no equalities)": ("from eq_proof import compile_spec, load_spec; compile_spec(load_spec('examples/spec_probability_simplex3.json'))", False),
+    "compile (equalities)":    ("from eq_proof import compile_spec, Spec; compile_spec(Spec('e', '0', ['x', 'y'], [{'type': 'equality', 'expr': 'Eq(y, 2*x)'}], [], []))", False),
+}
+_PROBE = ("import sys, time; t = time.perf_counter(); {stmt}; dt = time.perf_counter() - t; "
+          "print(dt, ','.join(m for m in {heavy!r} if m in sys.modules))")
+
+def _measure(stmt: str, repeat: int):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best, heavy = float("inf"), []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _PROBE.format(stmt=stmt, heavy=HEAVY)], cwd=root, capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(out[0])); heavy = out[1].split(",") if len(out) > 1 else []
+    return best, heavy
+
+def run(repeat: int = 5):
+    results = []
+    for name, (stmt, slim) in ENTRY_POINTS.items():
+        seconds, heavy = _measure(stmt, repeat)
+        results.append({"name": name, "statement": stmt, "seconds": seconds, "heavy_modules": heavy, "must_be_slim": slim})
+        print(f"{name:26s} {seconds * 1000:9.1f} ms  {','.join(heavy) or '-'}", file=sys.stderr)
+    return results
+
+def main():
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--repeat", type=int, default=5); p.add_argument("--out", default=None)
+    p.add_argument("--check", action="store_true", help="fail if a slim entry point imports SymPy/NumPy/matplotlib")
+    a = p.parse_args()
+    res = run(a.repeat)
+    if a.out:
+        with open(a.out, "w") as f: json.dump({"python": sys.version.split()[0], "results": res}, f, indent=2)
+    bad = [r["name"] for r in res if r["must_be_slim"] and r["heavy_modules"]]
+    if a.check and bad: print("heavy imports in: " + ", ".join(bad), file=sys.stderr); sys.exit(1)
+
+if __name__ == "__main__": main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Repair benchmark suite. Times each engine entry point on synthetic specs/records and writes JSON
+results that can be diffed across commits:
+
+    python -m benchmarks.run --scale default --out bench.json
+    python -m benchmarks.run --scale default --compare bench_main.json --threshold 1.25   # exit 1 on regression
+"""
+import argparse, json, platform, subprocess, sys, time
+import numpy as np
+from eq_proof import compile_spec, diagnose_and_repair, diagnose_and_repair_batch
+from eq_proof.attest import attest, attest_batch
+from eq_proof.repair import project_simplex, isotonic_increasing, pav_rows, project_capped_simplex_rows
+from eq_proof.qp import alternating_proj_equality_bounds
+from eq_proof.spec import spec_dict
+from eq_proof.verify import Verifier, verify_hmac
+from .generators import KINDS, gen_spec, gen_records
+
+SCALES = {  # (variable counts, record counts, max vars*records per case, max records through scalar loops)
+    "smoke":   ([10], [1, 100], 10**4, 100),
+    "default": ([10, 100, 1000], [1, 1000, 10000], 10**6, 200),
+    "full":    ([10, 100, 1000, 10000], [1, 1000, 100000, 1000000], 10**8, 20000),
+}
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter(); fn(); best = min(best, time.perf_counter() - t)
+    return best
+
+def run(scale: str, repeat: int = 3, kinds=KINDS):
+    var_counts, rec_counts, max_cells, max_scalar = SCALES[scale]; results = []
+    def record(name, kind, n_vars, n, seconds):
+        results.append({"name": name, "kind": kind, "n_vars": n_vars, "n_records": n, "seconds": seconds,
+                        "per_record_us": seconds / max(n, 1) * 1e6, "records_per_sec": n / seconds if seconds else None})
+        print(f"{name:32s} {kind:9s} vars={n_vars:<6d} n={n:<8d} {seconds / max(n, 1) * 1e6:12.2f} us/rec", file=sys.stderr)
+    rng = np.random.default_rng(0)
+    for n_vars in var_counts:
+        y = rng.normal(0.3, 1.0, n_vars).tolist()
+        record("project_simplex", "simplex", n_vars, 1, _time(lambda: project_simplex(y), repeat))
+        record("isotonic_increasing", "monotone", n_vars, 1, _time(lambda: isotonic_increasing(y), repeat))
+        y_desc = sorted(y, reverse=True)  # worst case for pooling: every point merges
+        record("isotonic_increasing_worst", "monotone", n_vars, 1, _time(lambda: isotonic_increasing(y_desc), repeat))
+        if n_vars * 100 <= max_cells:
+            Y = rng.normal(0.3, 1.0, (100, n_vars))
+            record("pav_rows", "monotone", n_vars, 100, _time(lambda: pav_rows(Y), repeat))
+            record("project_capped_simplex_rows", "simplex", n_vars, 100, _time(lambda: project_capped_simplex_rows(Y, 2.0 / n_vars), repeat))
+        if n_vars <= 1000:
+            A = [rng.normal(size=n_vars).tolist()]; bnds = {i: (-1.0, 1.0) for i in range(n_vars)}
+            record("alternating_proj_equality_bounds", "equality", n_vars, 1, _time(lambda: alternating_proj_equality_bounds(y, A, [0.5], bnds), repeat))
+        for kind in kinds:
+            if kind in ("equality", "chain") and n_vars > 1000: continue  # SymPy compile of 5k+ equalities dominates
+            spec = gen_spec(kind, n_vars)
+            t = time.perf_counter(); cs = compile_spec(spec); record("compile_spec", kind, n_vars, 1, time.perf_counter() - t)
+            sd = spec_dict(cs)
+            for n in rec_counts:
+                if n * n_vars > max_cells: continue
+                recs = gen_records(spec, n)
+                scalar = recs[:max_scalar]
+                record("diagnose_and_repair", kind, n_vars, len(scalar), _time(lambda: [diagnose_and_repair(cs, r) for r in scalar], 1))
+                out = []
+                record("diagnose_and_repair_batch", kind, n_vars, n, _time(lambda: out.__setitem__(slice(None), diagnose_and_repair_batch(cs, recs)), 1))
+                signed = out[:max_scalar]; atts = []
+                record("attest", kind, n_vars, len(signed), _time(lambda: atts.__setitem__(slice(None), [attest(sd, r) for r in signed]), 1))
+                record("attest_batch", kind, n_vars, len(signed), _time(lambda: attest_batch(sd, signed), 1))
+                record("verify_hmac", kind, n_vars, len(atts), _time(lambda: [verify_hmac(a) for a in atts], 1))
+                v = Verifier()
+                record("Verifier", kind, n_vars, len(atts), _time(lambda: [v(a) for a in atts], 1))
+    return results
+
+def _meta():
+    try: commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except Exception: commit = ""
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(), "ts": int(time.time())}
+
+def compare(new, old, threshold: float) -> int:
+    """Print per-case slowdown ratios (new/old per-record time) to stderr; return how many exceed `threshold`."""
+    key = lambda r: (r["name"], r["kind"], r["n_vars"], r["n_records"])
+    base = {key(r): r for r in old["results"]}; bad = 0
+    for r in new["results"]:
+        o = base.get(key(r))
+        if not o or not o["per_record_us"]: continue
+        ratio = r["per_record_us"] / o["per_record_us"]; flag = ratio > threshold; bad += flag
+        print(f"{'REGRESSION' if flag else 'ok':10s} {ratio:6.2f}x  {r['name']} {r['kind']} vars={r['n_vars']} n={r['n_records']}", file=sys.stderr)
+    return bad
+
+def main():
+    p = argparse.ArgumentParser(description="EQ-PROOF repair benchmarks (JSON results)")
+    p.add_argument("--scale", choices=sorted(SCALES), default="default"); p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--kinds", default=",".join(KINDS)); p.add_argument("--out", default=None)
+    p.add_argument("--compare", default=None, help="previous results JSON; exit 1 if any case is slower than --threshold")
+    p.add_argument("--threshold", type=float, default=1.25)
+    a = p.parse_args()
+    res = {"meta": _meta(), "scale": a.scale, "results": run(a.scale, a.repeat, [k for k in a.kinds.split(",") if k])}
+    txt = json.dumps(res, indent=2)
+    if a.out:
+        with open(a.out, "w") as f: f.write(txt)
+    else: print(txt)
+    if a.compare:
+        with open(a.compare) as f: sys.exit(1 if compare(res, json.load(f), a.threshold) else 0)
+
+if __name__ == "__main__": main()
@@ -1,9 +1,11 @@
-
 #!/usr/bin/env python3
+"""Spreadsheet bridge. A `variable,value,unit` CSV is one record (proof JSON + Markdown); any other
+sheet is wide, one record per row and one column per variable: CSV, Parquet/Arrow (pyarrow) or XLSX
+(openpyxl), streamed in chunks through the batch engine, repaired rows written back in the input
+format and one proof per row (JSONL)."""
 import argparse, csv, os, json
 from eq_proof import load_spec
-from eq_proof.diagnose import diagnose_and_repair
-from eq_proof.attest import attest
+from eq_proof.stream import read_records, record_format, record_writer, repair_chunks, repair_one, spec_columns
 from eq_proof.report import render_markdown
 def read_csv(path):
     out={}
@@ -22,15 +24,48 @@ def write_csv(path, original, repaired, units):
         w=csv.writer(f); w.writerow(["variable","original","repaired","unit"])
         for k in sorted(set(original)|set(repaired)):
             w.writerow([k, original.get(k), repaired.get(k), units.get(k,"")])
+def is_long_csv(path):
+    """True for the one-record `variable,value[,unit]` layout."""
+    if record_format(path)!="csv": return False
+    with open(path, newline='') as f: head=next(csv.reader(f), [])
+    return {"variable","value"} <= {h.strip() for h in head}
+def repair_sheet(spec, path, out, proofs, *, chunk_size=10000, workers=1, batch_attest=False, cache=None):
+    """Wide sheet → repaired sheet (same format) + JSONL proofs (+ `<proofs>.batches.jsonl` with batch_attest). Returns (records, with violations)."""
+    os.makedirs(os.path.dirname(proofs) or ".", exist_ok=True); n=v=0
+    bat=os.path.splitext(proofs)[0]+".batches.jsonl"
+    with open(proofs,"w") as fp, record_writer(out, path, spec) as fr, (open(bat,"w") if batch_attest else open(os.devnull,"w")) as fb:
+        for header,pairs in repair_chunks(spec, read_records(path, numeric=spec_columns(spec)), chunk_size=chunk_size, batch_attest=batch_attest, inputs_path=path, workers=workers, cache=cache):
+            if header: fb.write(json.dumps(header, sort_keys=True)+"\n")
+            for res,att in pairs:
+                fr.write(res["repaired"]); fp.write(json.dumps(att, sort_keys=True)+"\n"); n+=1; v+=bool(res["report"]["violations"])
+    return n, v
 def main():
-    p=argparse.ArgumentParser(); p.add_argument("spec"); p.add_argument("csv")
-    p.add_argument("--out-csv", default="outputs/repaired.csv"); p.add_argument("--out-proof", default="outputs/proof_sheet.json"); p.add_argument("--out-md", default="outputs/proof_sheet.md")
+    p=argparse.ArgumentParser(description=__doc__); p.add_argument("spec"); p.add_argument("sheet", help="long CSV, or wide CSV/Parquet/Arrow/XLSX")
+    p.add_argument("--out-csv", default="outputs/repaired.csv", help="long CSV: variable,original,repaired,unit")
+    p.add_argument("--out-sheet", default=None, help="wide sheets: repaired rows (default outputs/repaired.<input extension>)")
+    p.add_argument("--out-proof", default=None, help="proof JSON (long) or JSONL, one per row (wide); default outputs/proof_sheet.json[l]")
+    p.add_argument("--out-md", default="outputs/proof_sheet.md")
+    p.add_argument("--chunk-size", type=int, default=10000); p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--batch-attest", action="store_true", help="wide sheets: one signed Merkle root per chunk")
+    p.add_argument("--cache", default=None, help="SQLite result cache: reuse the repair/proof of unchanged records")
     a=p.parse_args()
-    spec=load_spec(a.spec); inputs=read_csv(a.csv)
-    res=diagnose_and_repair(spec, inputs, spec_path=a.spec, inputs_path=a.csv)
-    spec_dict={"name":spec.name,"version":spec.version,"variables":spec.variables,"constraints":spec.constraints,"probes":spec.probes,"alternates":spec.alternates,"units":getattr(spec,"units",{})}
-    att=attest(spec_dict, res, spec_path=a.spec, inputs_path=a.csv)
+    spec=load_spec(a.spec); long=is_long_csv(a.sheet)
+    cache=None
+    if a.cache:
+        from eq_proof.cache import ResultCache
+        cache=ResultCache(a.cache)
+    try:
+        if not long:
+            out=a.out_sheet or "outputs/repaired"+os.path.splitext(a.sheet)[1].lower(); proofs=a.out_proof or "outputs/proof_sheet.jsonl"
+            n,v=repair_sheet(spec, a.sheet, out, proofs, chunk_size=a.chunk_size, workers=a.workers, batch_attest=a.batch_attest, cache=cache)
+            print(f"[OK] {n} rows ({v} with violations) → {out} | {proofs}"); return
+        inputs=read_csv(a.sheet)
+        res,att=repair_one(spec, inputs, cache=cache, spec_path=a.spec, inputs_path=a.sheet)
+    finally:
+        if cache: cache.close()
+    out_proof=a.out_proof or "outputs/proof_sheet.json"
     write_csv(a.out_csv, res["original"], res["repaired"], getattr(spec,"units",{}))
-    with open(a.out-proof,"w") as f: json.dump(att, f, indent=2)
-    with open(a.out_md,"w") as f: f.write(render_markdown(a.spec, a.csv, res, att))
+    os.makedirs(os.path.dirname(out_proof) or ".", exist_ok=True); os.makedirs(os.path.dirname(a.out_md) or ".", exist_ok=True)
+    with open(out_proof,"w") as f: json.dump(att, f, indent=2)
+    with open(a.out_md,"w") as f: f.write(render_markdown(a.spec, a.sheet, res, att))
 if __name__=="__main__": main()
@@ -2,21 +2,37 @@
 #!/usr/bin/env python3
 import argparse, json, os
 from eq_proof import load_spec
-from eq_proof.diagnose import diagnose_and_repair
-from eq_proof.attest import attest
 from eq_proof.report import render_markdown, report_lines
-def main():
-    p=argparse.ArgumentParser(description="EQ-PROOF: validate/repair numeric outputs (offline).")
-    p.add_argument("spec"); p.add_argument("inputs")
-    p.add_argument("--out", default="outputs/proof.json"); p.add_argument("--md", default="outputs/proof.md")
-    p.add_argument("--pdf", default=None)
-    a=p.parse_args()
+from eq_proof.instrument import profiling, write_stats
+def _run_stream(a):
+    from eq_proof.stream import read_records, record_format, record_writer, repair_chunks, spec_columns
+    out=a.out or "outputs/proofs.jsonl"; rep=a.out_repaired or os.path.join(os.path.dirname(out) or ".", "repaired"+(os.path.splitext(a.inputs)[1].lower() if record_format(a.inputs)!="jsonl" else ".jsonl"))
+    pack=out.endswith(".eqpb"); bat=a.out_batches or (None if pack else os.path.splitext(out)[0]+".batches.jsonl")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True); n=v=0
+    if pack:
+        from eq_proof.proofpack import ProofWriter
+        fp=ProofWriter(out); put=fp.add
+    else: fp=open(out,"w"); put=lambda att: fp.write(json.dumps(att, sort_keys=True)+"\n")
+    spec=load_spec(a.spec)
+    with fp, record_writer(rep, a.inputs, spec) as fr, (open(bat,"w") if a.batch_attest and bat else open(os.devnull,"w")) as fb:
+        for header,pairs in repair_chunks(spec, read_records(a.inputs, numeric=spec_columns(spec)), chunk_size=a.chunk_size, batch_attest=a.batch_attest, inputs_path=a.inputs, workers=a.workers, validate=a.validate, cache=a.cache):
+            if header:
+                if pack and not a.out_batches: fp.add_header(header)
+                else: fb.write(json.dumps(header, sort_keys=True)+"\n")
+            for res,att in pairs:
+                fr.write(res["repaired"]); put(att); n+=1; v+=bool(res["report"]["violations"])
+    print(f"[OK] {n} records ({v} with violations) → {out} | {rep}" + (f" | {bat}" if a.batch_attest and bat else ""))
+def _run(a):
+    from eq_proof.stream import repair_one
+    a.out=a.out or "outputs/proof.json"
     os.makedirs(os.path.dirname(a.out) or ".", exist_ok=True); os.makedirs(os.path.dirname(a.md) or ".", exist_ok=True)
     spec=load_spec(a.spec); values=json.load(open(a.inputs))
-    result=diagnose_and_repair(spec, values, spec_path=a.spec, inputs_path=a.inputs)
-    spec_dict = {"name":spec.name,"version":spec.version,"variables":spec.variables,"constraints":spec.constraints,"probes":spec.probes,"alternates":spec.alternates,"units":getattr(spec,"units",{})}
-    att=attest(spec_dict, result, spec_path=a.spec, inputs_path=a.inputs)
-    json.dump(att, open(a.out,"w"), indent=2); open(a.md,"w").write(render_markdown(a.spec, a.inputs, result, att))
+    result,att=repair_one(spec, values, validate=a.validate, cache=a.cache, spec_path=a.spec, inputs_path=a.inputs)
+    if a.out.endswith(".eqpb"):
+        from eq_proof.proofpack import ProofWriter
+        with ProofWriter(a.out) as w: w.add(att)
+    else: json.dump(att, open(a.out,"w"), indent=2)
+    open(a.md,"w").write(render_markdown(a.spec, a.inputs, result, att))
     if a.pdf:
         try:
             from eq_proof.pdf import save_text_pdf
@@ -24,4 +40,31 @@ def main():
         except Exception as e:
             print(f"[WARN] PDF not created: {e}")
     print(f"[OK] → {a.out} | {a.md}" + (f" | {a.pdf}" if a.pdf else ""))
+def main():
+    p=argparse.ArgumentParser(description="EQ-PROOF: validate/repair numeric outputs (offline).")
+    p.add_argument("spec"); p.add_argument("inputs")
+    p.add_argument("--out", default=None, help="proof file; *.eqpb writes the compact binary container (see eq_proof/proofpack.py)"); p.add_argument("--md", default="outputs/proof.md")
+    p.add_argument("--pdf", default=None)
+    p.add_argument("--stream", action="store_true", help="inputs is JSONL, or CSV/Parquet/Arrow/XLSX with one record per row; writes JSONL proofs (or an .eqpb pack) to --out and repaired records in the input format")
+    p.add_argument("--chunk-size", type=int, default=10000); p.add_argument("--out-repaired", default=None)
+    p.add_argument("--workers", type=int, default=1, help="with --stream: repair/sign chunks in N worker processes")
+    p.add_argument("--batch-attest", action="store_true", help="with --stream: sign one Merkle root per chunk; records carry inclusion paths")
+    p.add_argument("--out-batches", default=None, help="signed batch headers (JSONL); default <out>.batches.jsonl, or inside the --out .eqpb pack")
+    p.add_argument("--validate", action="store_true", help="check first; records that already satisfy the spec get a minimal proof without repair")
+    p.add_argument("--profile", choices=["cprofile","sample"], default=None, help="profile the run (report on stderr)")
+    p.add_argument("--profile-out", default=None, help="cProfile: pstats dump; sample: JSON of hot frames")
+    p.add_argument("--stats-out", default=None, help="per-stage/per-constraint stats: JSON for *.json, Prometheus text otherwise")
+    p.add_argument("--cache", default=None, help="SQLite result cache: reuse repairs/proofs of records seen before")
+    p.add_argument("--cache-max-mb", type=int, default=512)
+    a=p.parse_args()
+    if a.cache:
+        from eq_proof.cache import ResultCache
+        a.cache=ResultCache(a.cache, max_bytes=a.cache_max_mb<<20)
+    try:
+        with profiling(a.profile, a.profile_out):
+            if a.stream: _run_stream(a)
+            else: _run(a)
+    finally:
+        if a.cache: a.cache.close()
+    if a.stats_out: write_stats(a.stats_out)
 if __name__=="__main__": main()
@@ -1,4 +1,26 @@
+"""EQ-PROOF. Submodules load on first use: `verify` / `attest` need only the standard library,
+the repair engine pulls in NumPy (and SymPy once a spec has equalities), `pdf` matplotlib."""
+from importlib import import_module
+from . import no_net as _no_net  # noqa: F401
 
-from .spec import load_spec, Spec
-from .diagnose import diagnose_and_repair
+_LAZY = {
+    "load_spec": "spec", "Spec": "spec",
+    "compile_spec": "compiled", "CompiledSpec": "compiled",
+    "diagnose_and_repair": "diagnose",
+    "diagnose_and_repair_batch": "batch",
+    "validate": "validation", "validate_batch": "validation",
+}
+# eager (standard library only): a lazy `attest` would be shadowed by the submodule once
+# `eq_proof.attest` is imported, since importing a submodule binds it on the package
 from .attest import attest
+__all__ = list(_LAZY) + ["attest"]
+
+def __getattr__(name):
+    mod = _LAZY.get(name)
+    if mod is None: raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    val = getattr(import_module(f".{mod}", __name__), name)
+    globals()[name] = val
+    return val
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
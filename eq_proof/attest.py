@@ -1,6 +1,13 @@
 
-import os, json, hashlib, hmac, time, platform
+from functools import lru_cache
+from typing import List, Tuple
+import os, json, hashlib, hmac, time
 from . import no_net as _no_net  # noqa: F401
+from . import merkle
+from .instrument import runtime_env
+from .spec import spec_hash
+
+ENGINE_VERSION = "0.1.0"
 
 def _load_secret() -> bytes:
     key = os.environ.get("EQPROOF_KEY")
@@ -10,7 +17,8 @@ def _load_secret() -> bytes:
         with open(p,"rb") as f: return f.read().strip() or b"DEMO_KEY"
     return b"DEMO_KEY"
 
-def _try_ed25519_sign(msg: bytes):
+def _load_ed25519():
+    """(SigningKey, public key hex) from keys/ed25519_sk.hex, or None without pynacl / key file."""
     try:
         import nacl.signing, nacl.encoding  # type: ignore
     except Exception:
@@ -21,31 +29,76 @@ def _try_ed25519_sign(msg: bytes):
     with open(sk_path,"r") as f: sk_hex=f.read().strip()
     try:
         sk = nacl.signing.SigningKey(sk_hex, encoder=nacl.encoding.HexEncoder)  # type: ignore
-        signed = sk.sign(msg)
-        pk_hex = sk.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode("utf-8")  # type: ignore
-        return {"algo":"ED25519","signature": signed.signature.hex(),"pubkey": pk_hex}
+        return sk, sk.verify_key.encode(encoder=nacl.encoding.HexEncoder).decode("utf-8")  # type: ignore
+    except Exception:
+        return None
+
+# keys are read once per process and then held in memory; reload_keys() picks up rotated keys
+_secret = lru_cache(maxsize=None)(_load_secret)
+_ed25519 = lru_cache(maxsize=None)(_load_ed25519)
+
+def reload_keys() -> None:
+    _secret.cache_clear(); _ed25519.cache_clear()
+
+def signer_id() -> str:
+    """Which key signs new attestations: "ed25519:<public key>" or "hmac:<secret digest prefix>"."""
+    key = _ed25519()
+    return f"ed25519:{key[1]}" if key is not None else "hmac:" + hashlib.sha256(_secret()).hexdigest()[:16]
+
+def _try_ed25519_sign(msg: bytes):
+    key = _ed25519()
+    if key is None: return None
+    try:
+        return {"algo":"ED25519","signature": key[0].sign(msg).signature.hex(),"pubkey": key[1]}
     except Exception:
         return None
 
 def _hash_bytes(b: bytes) -> str: return hashlib.sha256(b).hexdigest()
 
+def _sign(payload: dict) -> dict:
+    msg = json.dumps(payload, sort_keys=True).encode("utf-8")
+    ed = _try_ed25519_sign(msg)
+    if ed:
+        payload.update(ed)
+    else:
+        sig = hmac.new(_secret(), msg, hashlib.sha256).hexdigest()
+        payload["signature"]=sig; payload["algo"]="HMAC-SHA256"
+    return payload
+
 def attest(spec: dict, proof: dict, *, spec_path: str = "", inputs_path: str = "") -> dict:
     payload = {
         "spec": spec,
         "proof": proof,
         "meta": {
-            "spec_hash": _hash_bytes(json.dumps(spec, sort_keys=True).encode("utf-8")),
+            "spec_hash": spec_hash(spec),
             "inputs_hash": _hash_bytes(json.dumps(proof.get("original",{}), sort_keys=True).encode("utf-8")) if proof else "",
-            "engine_version": "0.1.0",
-            "runtime_env": {"python": platform.python_version(), "platform": platform.platform()}
+            "engine_version": ENGINE_VERSION,
+            "runtime_env": runtime_env()
         },
         "ts": int(time.time())
     }
-    msg = json.dumps(payload, sort_keys=True).encode("utf-8")
-    ed = _try_ed25519_sign(msg)
-    if ed:
-        payload.update(ed)
-    else:
-        sig = hmac.new(_load_secret(), msg, hashlib.sha256).hexdigest()
-        payload["signature"]=sig; payload["algo"]="HMAC-SHA256"
-    return payload
+    return _sign(payload)
+
+def attest_batch(spec: dict, proofs: List[dict], *, spec_path: str = "", inputs_path: str = "") -> Tuple[dict, List[dict]]:
+    """Sign a whole batch once. Each record payload (proof + spec/inputs hashes, no embedded spec)
+    becomes a Merkle leaf; the returned header carries the spec, the root and the one signature,
+    and each record carries its inclusion path under "batch". See `verify.verify_inclusion`."""
+    sh = spec_hash(spec)
+    records = [{"proof": p, "meta": {"spec_hash": sh, "engine_version": ENGINE_VERSION,
+                "inputs_hash": _hash_bytes(json.dumps(p.get("original",{}), sort_keys=True).encode("utf-8")) if p else ""}}
+               for p in proofs]
+    root, paths = merkle.build([merkle.leaf_hash(r) for r in records])
+    for i, (r, path) in enumerate(zip(records, paths)):
+        r["batch"] = {"root": root.hex(), "index": i, "size": len(records), "path": path}
+    header = _sign({
+        "spec": spec,
+        "merkle_root": root.hex(),
+        "size": len(records),
+        "meta": {
+            "spec_hash": sh,
+            "engine_version": ENGINE_VERSION,
+            "runtime_env": runtime_env()
+        },
+        "ts": int(time.time())
+    })
+    return header, records
@@ -0,0 +1,201 @@
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, List, Sequence, Union
+import numpy as np
+from . import no_net as _no_net  # noqa: F401
+from .spec import Spec
+from .compiled import CompiledSpec, compile_spec
+from .diagnose import TOLS, diagnose_and_repair, _settle
+from .repair import project_simplex_rows, pav_rows
+from .instrument import Probe, runtime_env
+
+def _columns(cs: CompiledSpec):
+    """Packed column order: spec.variables, then any other variable a constraint reads."""
+    cols = list(cs.variables); seen = set(cols)
+    def add(v):
+        if v not in seen: seen.add(v); cols.append(v)
+    for v in cs.bounds: add(v)
+    for c, ceq in cs.equalities:
+        for v in ceq.args + ceq.symbols + (ceq.sol_args or []) + ([ceq.target] if ceq.target else []): add(v)
+    for c in cs.constraints:
+        if c.get("type") in ("sum_leq", "simplex", "monotone"):
+            for v in c["vars"]: add(v)
+    # sum_leq caps are optional: a record without the cap variable uses the constant `cap`
+    caps = [c.get("cap_var", "cap") for c in cs.constraints if c.get("type") == "sum_leq"]
+    optional = [v for v in dict.fromkeys(caps) if v not in seen]
+    return cols, optional
+
+def _num(v) -> bool:
+    return isinstance(v, (int, float)) and not isinstance(v, bool)
+
+def _pack(rows: List[Dict[str, Any]], cols: List[str], optional: List[str]):
+    """(N, n) float64 matrix; rows holding a missing/non-numeric required value (None, strings,
+    bools, ...) are flagged for the scalar path, never coerced by NumPy. Missing optional columns are NaN."""
+    X = np.full((len(rows), len(cols) + len(optional)), np.nan)
+    scalar = np.zeros(len(rows), dtype=bool)
+    get = itemgetter(*cols) if len(cols) > 1 else (lambda r: (r[cols[0]],)) if cols else (lambda r: ())
+    try: vals = [get(r) for r in rows]
+    except KeyError: vals = None
+    if vals is not None and set(map(type, chain.from_iterable(vals))) <= {int, float}: X[:, :len(cols)] = vals
+    else:
+        good, vals = [], []
+        for i, r in enumerate(rows):
+            try: v = get(r)
+            except KeyError: scalar[i] = True; continue
+            if all(map(_num, v)): good.append(i); vals.append(v)
+            else: scalar[i] = True
+        if good: X[good, :len(cols)] = vals
+    for j, c in enumerate(optional, len(cols)):
+        for i, r in enumerate(rows):
+            v = r.get(c)
+            if _num(v): X[i, j] = v
+            elif v is not None: scalar[i] = True
+    return X, scalar
+
+def diagnose_and_repair_batch(spec: Union[Spec, CompiledSpec], records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorized `diagnose_and_repair` over many records sharing one spec.
+
+    Records are packed into an (N, n_vars) float64 matrix in `spec.variables` order and every
+    stage runs as NumPy operations over all rows. Rows that still break a constraint afterwards
+    get the scalar fixed-point rounds (`diagnose._settle`). Returns one result per record, in order,
+    with the same repaired values and step logs as the scalar path. Records that cannot be packed
+    (missing or non-numeric variables) are repaired with `diagnose_and_repair`."""
+    from .validation import clean_rows
+    cs = compile_spec(spec); units = getattr(cs, "units", {}) or {}; pr = Probe(cs.name)
+    N = len(records)
+    steps: List[List[dict]] = [[] for _ in range(N)]
+    cols, optional = _columns(cs)
+    coerced = list(records); X, scalar = _pack(coerced, cols, optional)
+    if units:
+        # P100: units, one vectorized conversion per spec variable over the rows that carry {value, unit}
+        urows = [i for i in np.flatnonzero(scalar).tolist() if any(isinstance(v, dict) for v in records[i].values())]
+        for i in urows: coerced[i] = dict(records[i])
+        for k, u in units.items():
+            hit = [i for i in urows if isinstance(records[i].get(k), dict) and "value" in records[i][k] and "unit" in records[i][k]]
+            if not hit: continue
+            vin = [float(records[i][k]["value"]) for i in hit]; fu = [str(records[i][k]["unit"]) for i in hit]
+            for i, v, f, v2 in zip(hit, vin, fu, cs.unit_table.convert_array(vin, fu, u).tolist()):
+                coerced[i][k] = v2; steps[i].append({"op": "unit_convert", "var": k, "from": f, "to": u, "value_in": v, "value_out": v2})
+        if urows:
+            X[urows], scalar[urows] = _pack([coerced[i] for i in urows], cols, optional)
+    ix = {c: j for j, c in enumerate(cols + optional)}
+    dirty = np.zeros(X.shape, dtype=bool); nv = int((~scalar).sum())
+    pr.lap("units")
+
+    # P90: bounds
+    if cs.bounds:
+        bj = [ix[k] for k in cs.bounds]
+        lo = np.array([np.nan if l is None else l for l, _ in cs.bounds.values()], dtype=float)
+        hi = np.array([np.nan if h is None else h for _, h in cs.bounds.values()], dtype=float)
+        # same comparisons as clip_bounds' max(lo, v) / min(hi, v), NaN included
+        B = X[:, bj]; Bc = np.where(np.isnan(lo) | (B > lo), B, lo); Bc = np.where(np.isnan(hi) | (Bc < hi), Bc, hi)
+        ch = (Bc != B) & ~(np.isnan(B) & np.isnan(Bc))
+        X[:, bj] = Bc; dirty[:, bj] |= ch
+        for n, k in enumerate(cs.bounds):
+            pr.count(cs.bound_labels[k], "checked", nv); pr.count(cs.bound_labels[k], "repaired", (ch[:, n] & ~scalar).sum())
+        for i in np.flatnonzero(ch.any(axis=1) & ~scalar):
+            r = coerced[i]
+            steps[i].append({"op": "bounds_clip", "before": {k: r.get(k) for k in cs.bounds},
+                             "after": {k: (float(Bc[i, n]) if ch[i, n] else r.get(k)) for n, k in enumerate(cs.bounds)}})
+        pr.lap("bounds")
+
+    # P80: equality (solve_for, then one joint projection for whatever is still violated)
+    pending = []
+    for c, ceq in cs.equalities:
+        expr = c["expr"]; tol = float(c.get("tol", TOLS["equality"])); lbl = cs.label(c)
+        res = np.abs(ceq.residual_rows(X, ix))
+        m = ~(res <= tol) & ~scalar
+        pr.count(lbl, "checked", nv); pr.count(lbl, "repaired", m.sum())
+        if not m.any(): pr.lap(lbl); continue
+        target = c.get("solve_for")
+        if target:
+            rows = np.flatnonzero(m); tj = ix[target]
+            new = ceq.solve_rows(X[rows], ix); ok = np.isfinite(new)
+            for i, before, v in zip(rows[ok], X[rows[ok], tj], new[ok]):
+                steps[i].append({"op": "equality_solve_for", "expr": expr, "target": target, "before": float(before), "after": float(v), "residual_before": float(res[i])})
+            X[rows[ok], tj] = new[ok]; dirty[rows[ok], tj] = True
+        res2 = np.abs(ceq.residual_rows(X, ix))
+        if (m & (res2 > tol)).any(): pending.append((c, ceq, m & (res2 > tol), res2))
+        pr.lap(lbl)
+    if pending:
+        jp = cs.joint; rows = np.flatnonzero(np.any([p[2] for p in pending], axis=0)); vj = [ix[v] for v in jp.vars]
+        if jp.system is None:  # nonlinear: trust region over re-linearized projections
+            tols = [float(c.get("tol", TOLS["equality"])) for c, _ in cs.equalities]
+            x0, xp, st = jp.trust_region_rows(X[rows], ix, tols, slack_frac=TOLS["sum_slack_frac"], iters=TOLS["tr_iters"], radius=TOLS["tr_radius"],
+                                              proj_iters=TOLS["proj_iters"], proj_tol=TOLS["proj_tol"])
+        else:
+            x0, xp, st = jp.project_rows(X[rows], ix, slack_frac=TOLS["sum_slack_frac"], iters=TOLS["proj_iters"], tol=TOLS["proj_tol"])
+        X[np.ix_(rows, vj)] = xp; dirty[np.ix_(rows, vj)] |= xp != x0
+        after = [np.abs(ceq.residual_rows(X[rows], ix)) for _, ceq, _, _ in pending]
+        for n, i in enumerate(rows.tolist()):
+            hit = [k for k, p in enumerate(pending) if p[2][i]]
+            step = {"op": "joint_projection" if jp.system is not None else "trust_region", "exprs": [pending[k][0]["expr"] for k in hit], "vars": list(jp.vars),
+                    "before": x0[n].tolist(), "after": xp[n].tolist(), "residual_before": [float(pending[k][3][i]) for k in hit],
+                    "residual_after": [float(after[k][n]) for k in hit], "iterations": int(st["iterations"][n]), "converged": bool(st["converged"][n])}
+            if jp.system is None: step["residual_history"] = st["residual_history"][n]
+            steps[i].append(step)
+        pr.lap("joint_projection" if jp.system is not None else "trust_region")
+
+    # P70: sum_leq caps (balanced softness: allow +0.5% slack before scaling)
+    for c in cs.constraints:
+        if c.get("type") != "sum_leq": continue
+        vars_ = c["vars"]; vj = [ix[v] for v in vars_]; lbl = cs.label(c)
+        cap = X[:, ix[c.get("cap_var", "cap")]].copy()
+        cap[np.isnan(cap)] = float(c.get("cap", 0.0))
+        Y = X[:, vj]; s = np.cumsum(Y, axis=1)[:, -1] if vj else np.zeros(N)
+        with np.errstate(all="ignore"):
+            big = (s > cap * (1.0 + TOLS["sum_slack_frac"])) & ~scalar
+            scale = np.where(s > 0, cap / np.where(s > 0, s, 1.0), 0.0)
+            Yh = scale[:, None] * Y; Yh = np.where(Yh > 0, Yh, 0.0)
+        X[np.ix_(big, vj)] = Yh[big]; dirty[np.ix_(big, vj)] = True
+        for i, cp, y, yh, sc in zip(np.flatnonzero(big).tolist(), cap[big].tolist(), Y[big].tolist(), Yh[big].tolist(), scale[big].tolist()):
+            steps[i].append({"op": "sum_leq_scale", "vars": vars_, "cap": cp, "before": y, "after": yh, "scale": sc})
+        soft = ~big & (s > cap) & ~scalar
+        for i, cp, sm in zip(np.flatnonzero(soft).tolist(), cap[soft].tolist(), s[soft].tolist()):
+            steps[i].append({"op": "sum_leq_soft_allow", "vars": vars_, "cap": cp, "sum": sm, "slack_frac": (sm / cp - 1.0)})
+        pr.count(lbl, "checked", nv); pr.count(lbl, "repaired", big.sum()); pr.count(lbl, "soft_allowed", soft.sum()); pr.lap(lbl)
+
+    # P60: simplex (balanced softness: allow sum within ±1e-6)
+    for c in cs.constraints:
+        if c.get("type") != "simplex": continue
+        vars_ = c["vars"]; vj = [ix[v] for v in vars_]; lbl = cs.label(c)
+        Y = X[:, vj]; s = np.cumsum(Y, axis=1)[:, -1] if vj else np.zeros(N)
+        bad = ((s < 1.0 - TOLS["simplex_sum_soft"]) | (s > 1.0 + TOLS["simplex_sum_soft"]) | (Y < TOLS["simplex_neg"]).any(axis=1)) & ~scalar
+        Yh = project_simplex_rows(Y[bad])
+        X[np.ix_(bad, vj)] = Yh; dirty[np.ix_(bad, vj)] = True
+        for i, y, yh in zip(np.flatnonzero(bad).tolist(), Y[bad].tolist(), Yh.tolist()):
+            steps[i].append({"op": "simplex_project", "vars": vars_, "before": y, "after": yh})
+        ok = ~bad & ~scalar
+        for i, sm in zip(np.flatnonzero(ok).tolist(), s[ok].tolist()):
+            steps[i].append({"op": "simplex_soft_allow", "vars": vars_, "sum": sm})
+        pr.count(lbl, "checked", nv); pr.count(lbl, "repaired", bad.sum()); pr.count(lbl, "soft_allowed", ok.sum()); pr.lap(lbl)
+
+    # P50: monotone (non-decreasing)
+    for c in cs.constraints:
+        if c.get("type") != "monotone": continue
+        vars_ = c["vars"]; vj = [ix[v] for v in vars_]; lbl = cs.label(c)
+        S = X[:, vj]
+        bad = (S[:, :-1] > S[:, 1:] + (-TOLS["monotone_slack"])).any(axis=1) & ~scalar
+        Sh = pav_rows(S[bad])
+        X[np.ix_(bad, vj)] = Sh; dirty[np.ix_(bad, vj)] = True
+        for i, seq, yhat in zip(np.flatnonzero(bad).tolist(), S[bad].tolist(), Sh.tolist()):
+            steps[i].append({"op": "isotonic", "vars": vars_, "before": seq, "after": yhat})
+        pr.count(lbl, "checked", nv); pr.count(lbl, "repaired", bad.sum()); pr.lap(lbl)
+
+    names = cols + optional; out: List[Dict[str, Any]] = [{} for _ in range(N)]
+    for i in np.flatnonzero(~scalar).tolist():
+        out[i] = {"original": dict(coerced[i]), "repaired": dict(coerced[i]), "report": {"violations": [], "steps": steps[i]}}
+    rows, js = np.nonzero(dirty & ~scalar[:, None])
+    for i, j, v in zip(rows.tolist(), js.tolist(), X[rows, js].tolist()): out[i]["repaired"][names[j]] = v
+    # rows a later pass broke again: same rounds and re-check as the scalar path
+    for i in np.flatnonzero(~clean_rows(cs, X, ix, sum_slack=TOLS["sum_slack_frac"]) & ~scalar).tolist():
+        out[i]["repaired"] = _settle(cs, out[i]["repaired"], out[i]["report"], pr)
+    pr.lap("recheck")
+
+    # per-record meta carries the batch cost amortized over its vectorized rows
+    env = runtime_env(); per = max(nv, 1)
+    elapsed_ms = pr.done(nv, "batch") // 1_000_000 // per; stages = {k: v // per for k, v in pr.stages.items()}
+    for i, sc in enumerate(scalar.tolist()):
+        if sc: out[i] = diagnose_and_repair(cs, records[i])
+        else: out[i]["report"]["meta"] = {"elapsed_ms": elapsed_ms, "stages_ns": stages, "env": env}
+    return out
@@ -0,0 +1,93 @@
+"""On-disk, content-addressed result cache (SQLite). Entries are keyed by (spec hash, canonical
+hash of the raw input record, engine key, mode) and hold the repair result plus, for per-record
+proofs, the attestation envelope (everything but the embedded spec and proof, which are the
+keyed spec and the stored result) and the id of the key that signed it. Total size is bounded: the least
+recently used entries are evicted once `max_bytes` is exceeded. Safe to share between processes."""
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib, json, os, sqlite3, time
+from . import no_net as _no_net  # noqa: F401
+
+Entry = Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]  # (result, attestation envelope, signer)
+
+def envelope(att: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in att.items() if k not in ("spec", "proof")}
+
+def attestation(sd: Dict[str, Any], result: Dict[str, Any], env: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild a cached attestation: the signed payload is spec + proof + envelope."""
+    return {"spec": sd, "proof": result, **env}
+
+def inputs_key(values: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON of a raw input record."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True).encode("utf-8")).hexdigest()
+
+def engine_key() -> str:
+    """Engine version plus a digest of the repair tolerances, so retuning TOLS invalidates entries."""
+    from .attest import ENGINE_VERSION
+    from .diagnose import TOLS
+    return f"{ENGINE_VERSION}+{hashlib.sha256(json.dumps(TOLS, sort_keys=True).encode('utf-8')).hexdigest()[:12]}"
+
+class ResultCache:
+    def __init__(self, path: str, *, max_bytes: int = 512 << 20, engine: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path, self.max_bytes, self.engine = path, max_bytes, engine or engine_key()
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL"); self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT NOT NULL, attestation TEXT,"
+                            " signer TEXT, size INTEGER NOT NULL, used REAL NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS results_used ON results(used)")
+            self.db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v INTEGER NOT NULL)")
+            self.db.execute("INSERT OR IGNORE INTO meta VALUES ('bytes', 0)")
+
+    def key(self, spec_hash: str, values: Dict[str, Any], mode: str) -> str:
+        return hashlib.sha256(f"{spec_hash}|{inputs_key(values)}|{self.engine}|{mode}".encode("utf-8")).hexdigest()
+
+    def get_many(self, spec_hash: str, records: Sequence[Dict[str, Any]], mode: str = "repair") -> List[Optional[Entry]]:
+        """One entry (or None) per record, in order; hits are marked as recently used."""
+        keys = [self.key(spec_hash, r, mode) for r in records]
+        found = {k: (json.loads(res), json.loads(att) if att else None, signer)
+                 for k, res, att, signer in self._select("key, result, attestation, signer", list(dict.fromkeys(keys)))}
+        if found:
+            now = time.time()
+            with self.db:
+                self.db.execute("BEGIN IMMEDIATE"); self.db.executemany("UPDATE results SET used = ? WHERE key = ?", [(now, k) for k in found])
+        return [found.get(k) for k in keys]
+
+    def _select(self, cols: str, keys: List[str]):
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            yield from self.db.execute(f"SELECT {cols} FROM results WHERE key IN ({','.join('?' * len(part))})", part)
+
+    def put_many(self, spec_hash: str, items: Iterable[Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]],
+                 mode: str = "repair") -> None:
+        """Store (input record, result, attestation or None, signer id or None) items, then evict down to max_bytes."""
+        now = time.time(); rows: Dict[str, tuple] = {}
+        for values, res, att, signer in items:
+            r = json.dumps(res, sort_keys=True); a = json.dumps(envelope(att), sort_keys=True) if att is not None else None
+            k = self.key(spec_hash, values, mode); rows[k] = (k, r, a, signer, len(r) + len(a or ""), now)
+        if not rows: return
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            old = sum(size for _, size in self._select("key, size", list(rows)))
+            self.db.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows.values())
+            self.db.execute("UPDATE meta SET v = v + ? WHERE k = 'bytes'", (sum(r[4] for r in rows.values()) - old,))
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self.db.execute("SELECT v FROM meta WHERE k = 'bytes'").fetchone()[0]
+        if total <= self.max_bytes: return
+        target = int(self.max_bytes * 0.9); freed = 0; drop = []
+        for k, size in self.db.execute("SELECT key, size FROM results ORDER BY used"):
+            if total - freed <= target: break
+            drop.append((k,)); freed += size
+        self.db.executemany("DELETE FROM results WHERE key = ?", drop)
+        self.db.execute("UPDATE meta SET v = v - ? WHERE k = 'bytes'", (freed,))
+
+    def stats(self) -> Dict[str, int]:
+        n = self.db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {"entries": n, "bytes": self.db.execute("SELECT v FROM meta WHERE k = 'bytes'").fetchone()[0], "max_bytes": self.max_bytes}
+
+    def close(self) -> None: self.db.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
@@ -0,0 +1,185 @@
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+import numpy as np
+from . import no_net as _no_net  # noqa: F401
+from .spec import Spec
+from .units import ConversionTable
+from .qp import ProjectionSystem
+if TYPE_CHECKING: from .constraints import CompiledEquality
+
+class CompiledSpec:
+    """A `Spec` with every equality parsed, simplified and lambdified once.
+    Unknown attributes (name, version, probes, ...) are read from the wrapped spec."""
+    def __init__(self, spec: Spec):
+        self.spec = spec
+        names = tuple(spec.variables)
+        self.unit_table = ConversionTable()
+        self.bounds: Dict[str, Tuple[Any, Any]] = {}
+        self.equalities: List[Tuple[Dict[str, Any], "CompiledEquality"]] = []
+        # stable per-constraint names for stats: "<type>[<index in spec.constraints>]"
+        self._labels = {id(c): f"{c.get('type')}[{i}]" for i, c in enumerate(spec.constraints)}
+        self.bound_labels: Dict[str, str] = {}; self._eq: Dict[int, "CompiledEquality"] = {}
+        for c in spec.constraints:
+            if c.get("type") == "bounds":
+                self.bounds[c["var"]] = (c.get("lower", None), c.get("upper", None)); self.bound_labels[c["var"]] = self.label(c)
+            elif c.get("type") == "equality":
+                from .constraints import compile_equality  # SymPy is only needed for specs with equalities
+                sym_list = c.get("symbols", [v for v in spec.variables if v in c["expr"]])
+                self.equalities.append((c, compile_equality(c["expr"], names, c.get("solve_for"), tuple(sym_list)))); self._eq[id(c)] = self.equalities[-1][1]
+
+        self._joint: Optional["JointProjection"] = None
+        self.components = self._components()
+
+    def _components(self) -> List["Component"]:
+        """Split the variable-constraint graph into connected components (union-find over the
+        variables each constraint reads or writes), in order of first constraint."""
+        parent: Dict[str, str] = {}
+        def find(v):
+            while parent.setdefault(v, v) != v: parent[v] = parent[parent[v]]; v = parent[v]
+            return v
+        touched = []
+        for i, c in enumerate(self.spec.constraints):
+            t = c.get("type")
+            if t == "bounds": vs = [c["var"]]
+            elif t == "equality": ceq = self.equality(c); vs = list(ceq.args) + list(ceq.symbols) + ([ceq.target] if ceq.target else [])
+            elif t == "sum_leq": vs = list(c["vars"]) + [c.get("cap_var", "cap")]
+            elif t in ("simplex", "monotone"): vs = list(c["vars"])
+            else: continue
+            vs = vs or [f"#{i}"]; touched.append((c, vs))
+            for v in vs[1:]: parent[find(v)] = find(vs[0])
+        groups: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, None]]] = {}
+        for c, vs in touched:
+            cons, vars_ = groups.setdefault(find(vs[0]), ([], {})); cons.append(c); vars_.update(dict.fromkeys(vs))
+        comps = [Component(self, cons, list(vars_)) for cons, vars_ in groups.values()]
+        self._component = {id(c): k for k in comps for c in k.constraints}
+        return comps
+
+    def label(self, c: Dict[str, Any]) -> str:
+        return self._labels[id(c)]
+
+    def equality(self, c: Dict[str, Any]) -> "CompiledEquality":
+        return self._eq[id(c)]
+
+    def component(self, c: Dict[str, Any]) -> "Component":
+        return self._component[id(c)]
+
+    @property
+    def joint(self) -> "JointProjection":
+        if self._joint is None: self._joint = JointProjection(self)
+        return self._joint
+
+    def __getattr__(self, k):
+        if k == "spec": raise AttributeError(k)
+        return getattr(self.spec, k)
+
+class Component:
+    """Constraints linked (transitively) through shared variables. Repairing one component never
+    changes a variable another component reads."""
+    def __init__(self, cs: CompiledSpec, constraints: List[Dict[str, Any]], vars_: List[str]):
+        ids = {id(c) for c in constraints}
+        self.cs, self.constraints, self.vars = cs, constraints, vars_
+        self.equalities = [(c, ceq) for c, ceq in cs.equalities if id(c) in ids]
+        self.bounds = {c["var"]: cs.bounds[c["var"]] for c in constraints if c.get("type") == "bounds"}
+        self.coupled = any(c.get("type") in ("equality", "sum_leq", "simplex") for c in constraints)  # anything to project jointly
+        self._joint: Optional["JointProjection"] = None
+
+    @property
+    def joint(self) -> "JointProjection":
+        if self._joint is None: self._joint = JointProjection(self.cs, self.constraints)
+        return self._joint
+
+class JointProjection:
+    """All equality rows (linearized at the current point), sum_leq caps, simplex rows and bounds of
+    one spec stacked into a single `ProjectionSystem` over `vars`. When every equality is linear the
+    system (and its factorization) is built once per spec; otherwise once per record. `constraints`
+    restricts it to a subset (one `Component`)."""
+    def __init__(self, cs: CompiledSpec, constraints: Optional[List[Dict[str, Any]]] = None):
+        cons = cs.constraints if constraints is None else constraints; ids = {id(c) for c in cons}
+        eqs = [ceq for c, ceq in cs.equalities if id(c) in ids]
+        vars_ = list(dict.fromkeys([s for ceq in eqs for s in ceq.symbols] +
+                                   [v for c in cons if c.get("type") in ("sum_leq", "simplex") for v in c["vars"]]))
+        ix = {v: i for i, v in enumerate(vars_)}
+        def row(vs):
+            r = np.zeros(len(vars_)); r[[ix[v] for v in vs]] = 1.0; return r
+        self.vars, self.eqs = vars_, eqs
+        self.simplex = [row(c["vars"]) for c in cons if c.get("type") == "simplex"]
+        self.caps = [(c.get("cap_var", "cap"), float(c.get("cap", 0.0))) for c in cons if c.get("type") == "sum_leq"]
+        self.G = [row(c["vars"]) for c in cons if c.get("type") == "sum_leq"]
+        simplex_vars = {v for c in cons if c.get("type") == "simplex" for v in c["vars"]}
+        lo = [cs.bounds.get(v, (None, None))[0] for v in vars_]; hi = [cs.bounds.get(v, (None, None))[1] for v in vars_]
+        self.lo = np.array([max(0.0 if v in simplex_vars else -np.inf, -np.inf if l is None else l) for v, l in zip(vars_, lo)])
+        self.hi = np.array([np.inf if h is None else h for h in hi])
+        self.names = list(dict.fromkeys(vars_ + [a for ceq in eqs for a in ceq.args] + [cv for cv, _ in self.caps]))
+        self.system = self._system([ceq.grad({}) for ceq in eqs]) if all(ceq.linear for ceq in eqs) else None
+
+    def pack(self, values: Dict[str, Any]):
+        """One-row matrix over `names` for `project_rows` (absent projection vars read as 0.0, absent caps as NaN)."""
+        x = [float(values[n]) if n in values else (0.0 if n in self.vars else np.nan) for n in self.names]
+        return np.array([x]), {n: j for j, n in enumerate(self.names)}
+
+    def _eq_block(self, grads) -> np.ndarray:
+        """Equality gradients (over each equality's symbols) scattered into `vars` columns."""
+        E = np.zeros((len(self.eqs), len(self.vars))); ix = {v: i for i, v in enumerate(self.vars)}
+        for k, (ceq, gr) in enumerate(zip(self.eqs, grads)):
+            for s, a in zip(ceq.symbols, gr): E[k, ix[s]] += a
+        return E
+
+    def _system(self, grads) -> ProjectionSystem:
+        return ProjectionSystem(np.vstack([self._eq_block(grads)] + ([np.array(self.simplex)] if self.simplex else [])),
+                                np.array(self.G).reshape(-1, len(self.vars)), self.lo, self.hi)
+
+    def project_rows(self, X: np.ndarray, ix: Dict[str, int], *, slack_frac: float = 0.0, iters: int = 1000, tol: float = 1e-10):
+        """Project the rows of a batch matrix (columns per `ix`); sum_leq caps get `slack_frac` headroom.
+        Returns (x0, x, stats) over `vars`."""
+        cols = [ix[v] for v in self.vars]; x0 = X[:, cols]
+        grads = [ceq.grad_rows(X, ix) for ceq in self.eqs]
+        # a.x = a.x0 - f(x0): exact for linear rows, first-order otherwise
+        e_eq = np.column_stack([np.einsum("ij,ij->i", gr, X[:, [ix[s] for s in ceq.symbols]]) - ceq.residual_rows(X, ix)
+                                for ceq, gr in zip(self.eqs, grads)]) if self.eqs else np.zeros((len(X), 0))
+        e = np.hstack([e_eq, np.ones((len(X), len(self.simplex)))])
+        g = np.column_stack([np.where(np.isnan(X[:, ix[cv]]), cap, X[:, ix[cv]]) if cv in ix else np.full(len(X), cap)
+                             for cv, cap in self.caps]) * (1.0 + slack_frac) if self.caps else np.zeros((len(X), 0))
+        if self.system is not None:
+            x, st = self.system.project(x0, e, g, iters=iters, tol=tol)
+            return x0, x, st
+        out = [self._system([gr[i] for gr in grads]).project(x0[i:i + 1], e[i:i + 1], g[i:i + 1], iters=iters, tol=tol) for i in range(len(X))]
+        return x0, np.vstack([o[0] for o in out]), {k: np.concatenate([o[1][k] for o in out]) for k in ("iterations", "converged", "max_violation")}
+
+    def trust_region_rows(self, X: np.ndarray, ix: Dict[str, int], tols, *, slack_frac: float = 0.0, iters: int = 50,
+                          radius: float = 1.0, proj_iters: int = 1000, proj_tol: float = 1e-10):
+        """Trust-region repair for nonlinear equalities, one row at a time. Each iteration projects the
+        current point onto the equalities linearized there (plus caps, simplex rows and bounds), truncates
+        the step to the radius and accepts it if ||f|| actually drops; the radius grows or shrinks with the
+        ratio of actual to predicted reduction. Stops once every |f_k| <= tols[k].
+        Returns (x0, x, stats) over `vars`; stats carry per-row iterations, convergence and ||f|| history."""
+        cols = [ix[v] for v in self.vars]; X = np.array(X, dtype=float); x0 = X[:, cols].copy(); tols = np.asarray(tols, dtype=float)
+        its, conv, hist = [], [], []
+        for i in range(len(X)):
+            row = X[i:i + 1]
+            f = lambda: np.array([ceq.residual_rows(row, ix)[0] for ceq in self.eqs])
+            r = f(); h = [float(np.linalg.norm(r))]; k = 0
+            delta = radius * max(1.0, float(np.max(np.abs(row[0, cols]), initial=0.0)))
+            while k < iters and not (np.abs(r) <= tols).all() and delta > 1e-15:
+                k += 1; x = row[0, cols].copy()
+                J = self._eq_block([ceq.grad_rows(row, ix)[0] for ceq in self.eqs])
+                _, xp, _ = self.project_rows(row, ix, slack_frac=slack_frac, iters=proj_iters, tol=proj_tol)
+                d = xp[0] - x; nd = float(np.linalg.norm(d))
+                if not nd or not np.isfinite(nd): break
+                if nd > delta: d *= delta / nd
+                pred = float(np.linalg.norm(r + J @ d))
+                row[0, cols] = x + d; rn = f()
+                ared = h[-1] - float(np.linalg.norm(rn)); pr = h[-1] - pred
+                rho = ared / pr if pr > 0 else (1.0 if ared > 0 else -1.0)
+                if rho < 0.25: delta = 0.25 * min(delta, nd)
+                elif rho > 0.75 and nd >= delta: delta *= 2.0
+                if rho > 1e-4 and np.isfinite(rn).all(): r = rn; h.append(float(np.linalg.norm(r)))
+                else: row[0, cols] = x
+            its.append(k); conv.append(bool((np.abs(r) <= tols).all())); hist.append(h)
+        return x0, X[:, cols], {"iterations": np.array(its, dtype=int), "converged": np.array(conv, dtype=bool), "residual_history": hist}
+
+def compile_spec(spec) -> CompiledSpec:
+    """Compile `spec` once; the result is memoized on the Spec instance."""
+    if isinstance(spec, CompiledSpec): return spec
+    cs = spec.__dict__.get("_compiled")
+    if cs is None:
+        cs = CompiledSpec(spec); spec.__dict__["_compiled"] = cs
+    return cs
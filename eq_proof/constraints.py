@@ -1,32 +1,77 @@
-
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
 import sympy as sp
 from . import no_net as _no_net  # noqa: F401
 
-def _locals_from_values(values: Dict[str, float]):
-    syms = {k: sp.symbols(k, real=True) for k in values}
-    ctx = {"Eq": sp.Eq}
-    ctx.update(syms)
-    return ctx, syms
+def _kernel(args, expr):
+    names = [str(a) for a in args]
+    return names, sp.lambdify(args, expr, modules="numpy")
+
+class CompiledEquality:
+    """One `Eq(lhs, rhs)` parsed and simplified once; residual, gradient and
+    closed-form solution are lambdified into NumPy callables (scalars or columns)."""
+    def __init__(self, expr_str: str, names: Sequence[str], target: Optional[str] = None, symbols: Sequence[str] = ()):
+        all_names = set(names) | set(symbols) | ({target} if target else set())
+        syms = {k: sp.symbols(k, real=True) for k in all_names}
+        eq = sp.sympify(expr_str, locals={"Eq": sp.Eq, **syms})
+        self.expr_str = expr_str; self.target = target; self.symbols = list(symbols)
+        self.expr0 = sp.simplify(eq.lhs - eq.rhs)
+        self.args, self._res = _kernel(sorted(self.expr0.free_symbols, key=str), self.expr0)
+        self.sol_args, self._sol = None, None
+        if target:
+            try:
+                sol = sp.solve(eq, syms[target], dict=True)
+                if sol: self.sol_args, self._sol = _kernel(sorted(sol[0][syms[target]].free_symbols, key=str), sol[0][syms[target]])
+            except Exception:
+                pass
+        jac = [syms[s] for s in self.symbols]
+        derivs = [sp.diff(self.expr0, s) for s in jac]
+        self._grad = [sp.lambdify(jac, d, modules="numpy") for d in derivs]
+        # constant gradient and no free symbols outside `symbols`: a fixed row a.x = -f(0)
+        self.linear = all(not d.free_symbols for d in derivs) and set(self.args) <= set(self.symbols)
+        try: self.const = float(sp.N(self.expr0.subs({s: 0 for s in jac})))
+        except Exception: self.const = float("nan")
+
+    def residual(self, values: Dict[str, float]) -> float:
+        with np.errstate(all="ignore"):
+            return float(self._res(*[float(values[k]) for k in self.args]))
+
+    def solve(self, values: Dict[str, float]) -> Optional[float]:
+        if self._sol is None: return None
+        try:
+            with np.errstate(all="ignore"):
+                return float(self._sol(*[float(values[k]) for k in self.sol_args]))
+        except Exception:
+            return None
+
+    def grad(self, values: Dict[str, float]):
+        """Gradient over `symbols` at `values` (missing symbols read as 0.0)."""
+        x = [float(values.get(s, 0.0)) for s in self.symbols]
+        with np.errstate(all="ignore"):
+            return [float(g(*x)) for g in self._grad]
+
+    # Row-wise variants: X is an (N, n) float64 matrix, ix maps variable name -> column.
+    def residual_rows(self, X, ix):
+        with np.errstate(all="ignore"):
+            return np.broadcast_to(np.asarray(self._res(*[X[:, ix[k]] for k in self.args]), dtype=float), (len(X),))
+
+    def solve_rows(self, X, ix):
+        if self._sol is None: return np.full(len(X), np.nan)
+        with np.errstate(all="ignore"):
+            return np.broadcast_to(np.asarray(self._sol(*[X[:, ix[k]] for k in self.sol_args]), dtype=float), (len(X),))
+
+    def grad_rows(self, X, ix):
+        cols = [X[:, ix[s]] for s in self.symbols]
+        with np.errstate(all="ignore"):
+            return np.column_stack([np.broadcast_to(np.asarray(g(*cols), dtype=float), (len(X),)) for g in self._grad]) if self._grad else np.zeros((len(X), 0))
+
+@lru_cache(maxsize=1024)
+def compile_equality(expr_str: str, names: Tuple[str, ...], target: Optional[str] = None, symbols: Tuple[str, ...] = ()) -> CompiledEquality:
+    return CompiledEquality(expr_str, names, target, symbols)
 
 def equality_residual(expr_str: str, values: Dict[str, float]) -> float:
-    locals_, syms = _locals_from_values(values)
-    eq = sp.sympify(expr_str, locals=locals_)
-    subs_map = {syms[k]: float(v) for k,v in values.items() if k in syms}
-    res = sp.simplify(eq.lhs - eq.rhs).subs(subs_map)
-    return float(sp.N(res))
+    return compile_equality(expr_str, tuple(sorted(values))).residual(values)
 
 def equality_solve_for(expr_str: str, target: str, values: Dict[str, float]) -> Optional[float]:
-    all_names = set(values) | {target}
-    syms = {k: sp.symbols(k, real=True) for k in all_names}
-    locals_ = {"Eq": sp.Eq, **syms}
-    eq = sp.sympify(expr_str, locals=locals_)
-    t = syms[target]
-    try:
-        sol = sp.solve(eq, t, dict=True)
-        if not sol: return None
-        subs_map = {syms[k]: float(v) for k,v in values.items() if k in syms}
-        v = float(sp.N(sol[0][t].subs(subs_map)))
-        return v
-    except Exception:
-        return None
+    return compile_equality(expr_str, tuple(sorted(values)), target).solve(values)
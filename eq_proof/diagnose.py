@@ -1,22 +1,25 @@
 
-from typing import Dict, Any, Tuple
-import numpy as np, sympy as sp, platform, hashlib, time, json
+from typing import Dict, Any, List, Tuple, Union
+import numpy as np, hashlib, json
 from . import no_net as _no_net  # noqa: F401
 from .spec import Spec
-from .constraints import equality_residual, equality_solve_for
+from .compiled import CompiledSpec, compile_spec
 from .repair import project_simplex, clip_bounds, isotonic_increasing
-from .qp import alternating_proj_equality_bounds
 from .units import coerce_inputs_to_spec_units
+from .instrument import Probe, runtime_env
 
 TOLS = {
     "equality": 1e-9,
     "simplex_sum": 1e-9,
     "simplex_neg": -1e-12,
     "monotone_slack": -1e-12,
-    "altproj_iters": 200,
-    "altproj_tol": 1e-9,
+    "proj_iters": 1000,
+    "proj_tol": 1e-12,
+    "tr_iters": 50,
+    "tr_radius": 1.0,  # initial trust radius, relative to max(1, |x|_inf)
     "sum_slack_frac": 0.005,  # +0.5% slack allowed (balanced softness)
-    "simplex_sum_soft": 1e-6  # +/- window
+    "simplex_sum_soft": 1e-6,  # +/- window
+    "sched_rounds": 8  # fixed-point rounds per component after the first pass
 }
 
 def _hash_file(path: str) -> str:
@@ -26,94 +29,161 @@ def _hash_file(path: str) -> str:
     except Exception:
         return ""
 
-def diagnose_and_repair(spec: Spec, values: Dict[str, float], *, spec_path: str = "", inputs_path: str = "") -> Dict[str, Any]:
-    started = time.time()
-    # Units normalize (P100)
-    coerced, unit_steps = coerce_inputs_to_spec_units(values, getattr(spec,"units",{}))
-    original = dict(coerced); repaired = dict(coerced)
-    report = {"violations": [], "steps": []}
-    report["steps"].extend(unit_steps)
+def _broken(cs: CompiledSpec, values: Dict[str, Any], constraints) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    out=[]
+    for c in constraints:
+        t=c.get("type")
+        if t=="bounds":
+            k=c["var"]; lo,hi=cs.bounds[k]; v=values.get(k)
+            if v is not None and not ((lo is None or v>=lo) and (hi is None or v<=hi)): out.append((c, {"type":"bounds","var":k,"value":v,"lower":lo,"upper":hi}))
+        elif t=="equality":
+            ceq=cs.equality(c); r=abs(ceq.residual(values))
+            if r>float(c.get("tol", TOLS["equality"])): out.append((c, {"type":"equality","expr":c["expr"],"residual":r}))
+        elif t=="sum_leq":
+            s=sum(float(values.get(v,0.0)) for v in c["vars"]); cap=float(values.get(c.get("cap_var","cap"), c.get("cap",0.0)))
+            if s>cap*(1.0 + TOLS["sum_slack_frac"]): out.append((c, {"type":"sum_leq","vars":c["vars"],"sum":s,"cap":cap}))
+        elif t=="simplex":
+            y=[float(values.get(v,0.0)) for v in c["vars"]]; s=sum(y)
+            if not abs(s-1.0)<=TOLS["simplex_sum_soft"] or any(v<TOLS["simplex_neg"] for v in y): out.append((c, {"type":"simplex","vars":c["vars"],"sum":s}))
+        elif t=="monotone":
+            seq=[float(values.get(v,0.0)) for v in c["vars"]]
+            if any(seq[i]>seq[i+1]+(-TOLS["monotone_slack"]) for i in range(len(seq)-1)): out.append((c, {"type":"monotone","vars":c["vars"]}))
+    return out
 
-    # Collect bounds upfront
-    bounds={}
-    for c in spec.constraints:
-        if c.get("type")=="bounds":
-            bounds[c["var"]] = (c.get("lower",None), c.get("upper",None))
+def violations(cs: CompiledSpec, values: Dict[str, Any], constraints=None) -> List[Dict[str, Any]]:
+    """Constraints (default: all) that `values` breaks beyond the windows the passes accept
+    (sum_leq gets sum_slack_frac headroom, simplex sums simplex_sum_soft)."""
+    return [v for _, v in _broken(cs, values, cs.constraints if constraints is None else constraints)]
 
+def _joint(cs, part, repaired, report, pr, eqs):
+    """One joint step over `part` (the whole spec, or one component): projection when every equality
+    is linear, trust region otherwise. `eqs` = [(c, ceq, residual)] being repaired."""
+    jp=part.joint; X, ix = jp.pack(repaired)
+    if jp.system is None:  # nonlinear: trust region over re-linearized projections
+        tols=[float(c.get("tol", TOLS["equality"])) for c, _ in part.equalities]
+        x0, x, st = jp.trust_region_rows(X, ix, tols, slack_frac=TOLS["sum_slack_frac"], iters=TOLS["tr_iters"], radius=TOLS["tr_radius"],
+                                         proj_iters=TOLS["proj_iters"], proj_tol=TOLS["proj_tol"])
+    else:
+        x0, x, st = jp.project_rows(X, ix, slack_frac=TOLS["sum_slack_frac"], iters=TOLS["proj_iters"], tol=TOLS["proj_tol"])
+    for v,a,b in zip(jp.vars, x0[0].tolist(), x[0].tolist()):
+        if a!=b: repaired[v]=b
+    after=[abs(ceq.residual(repaired)) for _, ceq, _ in eqs]
+    step={"op":"joint_projection" if jp.system is not None else "trust_region","exprs":[c["expr"] for c,_,_ in eqs],"vars":list(jp.vars),"before":x0[0].tolist(),"after":x[0].tolist(),
+          "residual_before":[r for _,_,r in eqs],"residual_after":after,"iterations":int(st["iterations"][0]),"converged":bool(st["converged"][0])}
+    if jp.system is None: step["residual_history"]=st["residual_history"][0]
+    report["steps"].append(step); pr.lap(step["op"])
+
+def _passes(cs, part, repaired, report, pr, rnd=0):
+    """The P90..P50 passes over the constraints of `part`. Round 0 is the plain pipeline; in later
+    rounds the joint step always runs first and soft allowances are not logged again."""
     # P90: bounds
-    if bounds:
-        before={k:repaired.get(k) for k in bounds}
-        repaired=clip_bounds(repaired, bounds)
-        after={k:repaired.get(k) for k in bounds}
+    if part.bounds:
+        before={k:repaired.get(k) for k in part.bounds}
+        repaired=clip_bounds(repaired, part.bounds)
+        after={k:repaired.get(k) for k in part.bounds}
         if before!=after: report["steps"].append({"op":"bounds_clip","before":before,"after":after})
+        for k in part.bounds:
+            lbl=cs.bound_labels[k]; pr.count(lbl,"checked"); pr.count(lbl,"repaired",before[k]!=after[k])
+        pr.lap("bounds")
 
-    # P80: equality (solve_for then fallback)
-    for c in spec.constraints:
-        if c.get("type")=="equality":
-            expr=c["expr"]; tol=float(c.get("tol", TOLS["equality"]))
-            res=abs(equality_residual(expr, repaired))
-            if res<=tol: continue
-            target=c.get("solve_for")
-            if target:
-                new=equality_solve_for(expr, target, repaired)
-                if new is not None and np.isfinite(new):
-                    before=repaired.get(target); repaired[target]=float(new)
-                    report["steps"].append({"op":"equality_solve_for","expr":expr,"target":target,"before":before,"after":new,"residual_before":res})
-            res2=abs(equality_residual(expr, repaired))
-            if res2>tol:
-                sym_list=c.get("symbols",[v for v in spec.variables if v in expr])
-                loc={s: sp.symbols(s, real=True) for s in sym_list}
-                eq=sp.sympify(expr, locals={"Eq": sp.Eq, **loc})
-                expr0=sp.simplify(eq.lhs - eq.rhs)
-                A_row=[float(sp.N(sp.diff(expr0, loc[s]).subs({loc[k]: repaired.get(k,0.0) for k in sym_list}))) for s in sym_list]
-                const=float(sp.N(expr0.subs({loc[k]: 0 for k in sym_list})))
-                b_val=-const
-                idx_bounds={i: bounds.get(s,(None,None)) for i,s in enumerate(sym_list)}
-                x0=[float(repaired.get(s,0.0)) for s in sym_list]
-                xhat=alternating_proj_equality_bounds(x0, [A_row], [b_val], idx_bounds, iters=TOLS["altproj_iters"], tol=TOLS["altproj_tol"])
-                for s,val in zip(sym_list, xhat): repaired[s]=float(val)
-                res3=abs(equality_residual(expr, repaired))
-                report["steps"].append({"op":"equality_qp_fallback","expr":expr,"symbols":sym_list,"before":x0,"after":[repaired[s] for s in sym_list],"residual_before":res2,"residual_after":res3})
-                if res3>tol: report["violations"].append({"type":"equality","expr":expr,"residual":res3})
+    # P80: equality (solve_for, then one joint projection for whatever is still violated)
+    pending=[]
+    for c, ceq in part.equalities:
+        expr=c["expr"]; tol=float(c.get("tol", TOLS["equality"])); lbl=cs.label(c)
+        res=abs(ceq.residual(repaired)); pr.count(lbl,"checked")
+        if res<=tol:
+            if rnd: pending.append((c, ceq, res))
+            pr.lap(lbl); continue
+        pr.count(lbl,"repaired")
+        target=c.get("solve_for")
+        if target:
+            new=ceq.solve(repaired)
+            if new is not None and np.isfinite(new):
+                before=repaired.get(target); repaired[target]=float(new)
+                report["steps"].append({"op":"equality_solve_for","expr":expr,"target":target,"before":before,"after":new,"residual_before":res})
+        res2=abs(ceq.residual(repaired))
+        if res2>tol or rnd: pending.append((c, ceq, res2))
+        pr.lap(lbl)
+    if pending or (rnd and part.coupled): _joint(cs, part, repaired, report, pr, pending)
 
     # P70: sum_leq caps (balanced softness: allow +0.5% slack before scaling)
-    for c in spec.constraints:
+    for c in part.constraints:
         if c.get("type")=="sum_leq":
-            vars_=c["vars"]; cap=float(repaired.get(c.get("cap_var","cap"), c.get("cap",0.0)))
+            lbl=cs.label(c); pr.count(lbl,"checked"); vars_=c["vars"]; cap=float(repaired.get(c.get("cap_var","cap"), c.get("cap",0.0)))
             y=[float(repaired.get(v,0.0)) for v in vars_]; s=sum(y)
             if s > cap*(1.0 + TOLS["sum_slack_frac"]):
                 scale=cap/s if s>0 else 0.0
                 yhat=[max(0.0, scale*v) for v in y]
                 for v,val in zip(vars_, yhat): repaired[v]=float(val)
-                report["steps"].append({"op":"sum_leq_scale","vars":vars_,"cap":cap,"before":y,"after":yhat,"scale":scale})
-            elif s>cap:
-                report["steps"].append({"op":"sum_leq_soft_allow","vars":vars_,"cap":cap,"sum":s,"slack_frac":(s/cap-1.0)})
+                report["steps"].append({"op":"sum_leq_scale","vars":vars_,"cap":cap,"before":y,"after":yhat,"scale":scale}); pr.count(lbl,"repaired")
+            elif s>cap and not rnd:
+                report["steps"].append({"op":"sum_leq_soft_allow","vars":vars_,"cap":cap,"sum":s,"slack_frac":(s/cap-1.0)}); pr.count(lbl,"soft_allowed")
+            pr.lap(lbl)
 
     # P60: simplex (balanced softness: allow sum within ±1e-6)
-    for c in spec.constraints:
+    for c in part.constraints:
         if c.get("type")=="simplex":
-            vars_=c["vars"]; y=[float(repaired.get(v,0.0)) for v in vars_]
+            lbl=cs.label(c); pr.count(lbl,"checked"); vars_=c["vars"]; y=[float(repaired.get(v,0.0)) for v in vars_]
             s=sum(y)
             if (s < 1.0 - TOLS["simplex_sum_soft"]) or (s > 1.0 + TOLS["simplex_sum_soft"]) or any(v<TOLS["simplex_neg"] for v in y):
                 yhat=project_simplex(y)
                 for v,val in zip(vars_, yhat): repaired[v]=float(val)
-                report["steps"].append({"op":"simplex_project","vars":vars_,"before":y,"after":yhat})
-            else:
-                report["steps"].append({"op":"simplex_soft_allow","vars":vars_,"sum":s})
+                report["steps"].append({"op":"simplex_project","vars":vars_,"before":y,"after":yhat}); pr.count(lbl,"repaired")
+            elif not rnd:
+                report["steps"].append({"op":"simplex_soft_allow","vars":vars_,"sum":s}); pr.count(lbl,"soft_allowed")
+            pr.lap(lbl)
 
     # P50: monotone (non-decreasing)
-    for c in spec.constraints:
+    for c in part.constraints:
         if c.get("type")=="monotone":
-            vars_=c["vars"]; seq=[float(repaired.get(v,0.0)) for v in vars_]
+            lbl=cs.label(c); pr.count(lbl,"checked"); vars_=c["vars"]; seq=[float(repaired.get(v,0.0)) for v in vars_]
             bad=any(seq[i]>seq[i+1]+(-TOLS["monotone_slack"]) for i in range(len(seq)-1))
             if bad:
                 yhat=isotonic_increasing(seq)
                 for v,val in zip(vars_, yhat): repaired[v]=float(val)
-                report["steps"].append({"op":"isotonic","vars":vars_,"before":seq,"after":yhat})
+                report["steps"].append({"op":"isotonic","vars":vars_,"before":seq,"after":yhat}); pr.count(lbl,"repaired")
+            pr.lap(lbl)
+    return repaired
+
+def _settle(cs, repaired, report, pr):
+    """Fixed-point rounds after the first pass: every component that still breaks one of its
+    constraints (a later pass undid an earlier one) gets a joint step plus its own passes again,
+    until it holds, a round revisits an earlier state (the constraints conflict) or `sched_rounds`
+    runs out. Components share no variables, so the rest of the record is never touched. Finishes
+    with a re-check of every constraint."""
+    broken=_broken(cs, repaired, cs.constraints)
+    for comp in dict.fromkeys(cs.component(c) for c, _ in broken):
+        seen=set()
+        for rnd in range(1, TOLS["sched_rounds"]+1):
+            if not _broken(cs, repaired, comp.constraints): break
+            state=tuple(repaired.get(v) for v in comp.vars)
+            if state in seen: break
+            seen.add(state); n=len(report["steps"]); repaired=_passes(cs, comp, repaired, report, pr, rnd)
+            for st in report["steps"][n:]: st["round"]=rnd
+    if broken: broken=_broken(cs, repaired, cs.constraints)
+    for c, v in broken:
+        pr.count(cs.label(c),"violated"); report["violations"].append(v)
+    pr.lap("recheck")
+    return repaired
+
+def diagnose_and_repair(spec: Union[Spec, CompiledSpec], values: Dict[str, float], *, spec_path: str = "", inputs_path: str = "") -> Dict[str, Any]:
+    """Units, then the P90..P50 passes over the whole spec, then `_settle` for whatever a later pass
+    broke again."""
+    cs = compile_spec(spec); pr = Probe(cs.name)
+    # Units normalize (P100)
+    coerced, unit_steps = coerce_inputs_to_spec_units(values, getattr(spec,"units",{}), cs.unit_table)
+    original = dict(coerced)
+    report = {"violations": [], "steps": []}
+    report["steps"].extend(unit_steps)
+    pr.lap("units")
+
+    repaired = _passes(cs, cs, dict(coerced), report, pr)
+    repaired = _settle(cs, repaired, report, pr)
 
-    elapsed_ms = int((time.time()-started)*1000)
+    elapsed_ns = pr.done()
     report["meta"] = {
-        "elapsed_ms": elapsed_ms,
-        "env": {"python": platform.python_version(), "platform": platform.platform()}
+        "elapsed_ms": elapsed_ns // 1_000_000,
+        "stages_ns": pr.stages,
+        "env": runtime_env()
     }
     return {"original":original,"repaired":repaired,"report":report}
@@ -0,0 +1,142 @@
+"""Per-process instrumentation: static env metadata, per-stage timings and per-constraint counters
+aggregated across records (exportable as JSON or Prometheus text), pluggable hooks and profiling."""
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from time import perf_counter_ns
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json, platform, sys, threading
+
+@lru_cache(maxsize=None)
+def _env() -> Tuple[Tuple[str, str], ...]:
+    return (("python", platform.python_version()), ("platform", platform.platform()))
+
+def runtime_env() -> Dict[str, str]:
+    """{python, platform}, computed once per process."""
+    return dict(_env())
+
+Hook = Callable[[str, Dict[str, Any]], None]
+_HOOKS: List[Hook] = []
+
+def add_hook(fn: Hook) -> Hook:
+    """Call fn(kind, payload) after every repaired record ("record") or vectorized batch ("batch");
+    payload = {spec, records, stages_ns, events}. Returns fn, so it works as a decorator."""
+    _HOOKS.append(fn); return fn
+
+def remove_hook(fn: Hook) -> None:
+    if fn in _HOOKS: _HOOKS.remove(fn)
+
+class Stats:
+    """Process-wide totals: stage time/calls per (spec, stage), event counts per (spec, constraint, event)."""
+    def __init__(self):
+        self._lock = threading.Lock(); self.reset()
+    def reset(self) -> None:
+        self.records: Dict[str, int] = defaultdict(int)
+        self.stage_ns: Dict[Tuple[str, str], int] = defaultdict(int); self.stage_calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.events: Dict[Tuple[str, str, str], int] = defaultdict(int)
+    def record(self, spec: str, stages: Dict[str, int], events: Dict[Tuple[str, str], int], n: int = 1, kind: str = "record") -> None:
+        with self._lock:
+            self.records[spec] += n
+            for k, v in stages.items(): self.stage_ns[spec, k] += v; self.stage_calls[spec, k] += 1
+            for (c, e), v in events.items(): self.events[spec, c, e] += v
+        if _HOOKS:
+            payload = {"spec": spec, "records": n, "stages_ns": stages, "events": {f"{c}.{e}": v for (c, e), v in events.items()}}
+            for h in list(_HOOKS): h(kind, payload)
+    def drain(self) -> Dict[str, Any]:
+        """Raw totals (picklable, for `merge` in another process); resets this instance."""
+        with self._lock:
+            raw = {"records": dict(self.records), "stage_ns": dict(self.stage_ns), "stage_calls": dict(self.stage_calls), "events": dict(self.events)}
+            self.reset()
+        return raw
+    def merge(self, raw: Dict[str, Any]) -> None:
+        with self._lock:
+            for name in ("records", "stage_ns", "stage_calls", "events"):
+                tgt = getattr(self, name)
+                for k, v in raw[name].items(): tgt[k] += v
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {s: {"records": n, "stages": {}, "constraints": {}} for s, n in self.records.items()}
+            for (s, k), ns in self.stage_ns.items():
+                out.setdefault(s, {"records": 0, "stages": {}, "constraints": {}})["stages"][k] = {"calls": self.stage_calls[s, k], "seconds": ns / 1e9}
+            for (s, c, e), n in self.events.items():
+                out.setdefault(s, {"records": 0, "stages": {}, "constraints": {}})["constraints"].setdefault(c, {})[e] = n
+        return {"env": runtime_env(), "specs": out}
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2, sort_keys=True)
+    def to_prometheus(self) -> str:
+        def fmt(lbl): return ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in lbl.items())
+        d = self.to_dict()["specs"]; lines = []
+        def metric(name, typ, help_, samples):
+            lines.extend([f"# HELP {name} {help_}", f"# TYPE {name} {typ}"])
+            lines.extend(f"{name}{{{fmt(lbl)}}} {val}" for lbl, val in samples)
+        metric("eqproof_records_total", "counter", "Records repaired.", [({"spec": s}, v["records"]) for s, v in sorted(d.items())])
+        metric("eqproof_stage_seconds_total", "counter", "Time spent per repair stage / constraint.",
+               [({"spec": s, "stage": k}, repr(t["seconds"])) for s, v in sorted(d.items()) for k, t in sorted(v["stages"].items())])
+        metric("eqproof_stage_calls_total", "counter", "Stage invocations (records, or vectorized batches).",
+               [({"spec": s, "stage": k}, t["calls"]) for s, v in sorted(d.items()) for k, t in sorted(v["stages"].items())])
+        metric("eqproof_constraint_events_total", "counter", "Constraint checks, repairs, soft allowances and residual violations.",
+               [({"spec": s, "constraint": c, "event": e}, n) for s, v in sorted(d.items()) for c, ev in sorted(v["constraints"].items()) for e, n in sorted(ev.items())])
+        return "\n".join(lines) + "\n"
+
+STATS = Stats()
+
+class Probe:
+    """Stage clock and constraint counters for one `diagnose_and_repair` call (or one batch);
+    `done` folds them into `STATS` and fires the hooks."""
+    __slots__ = ("spec", "stages", "events", "t0", "t")
+    def __init__(self, spec: str):
+        self.spec = spec; self.stages: Dict[str, int] = {}; self.events: Dict[Tuple[str, str], int] = {}
+        self.t0 = self.t = perf_counter_ns()
+    def lap(self, stage: str) -> None:
+        """Charge the time since the previous lap to `stage`."""
+        t = perf_counter_ns(); self.stages[stage] = self.stages.get(stage, 0) + t - self.t; self.t = t
+    def count(self, constraint: str, event: str, n: int = 1) -> None:
+        if n: self.events[constraint, event] = self.events.get((constraint, event), 0) + int(n)
+    def done(self, n: int = 1, kind: str = "record") -> int:
+        """Record into STATS; returns total elapsed ns."""
+        STATS.record(self.spec, self.stages, self.events, n, kind)
+        return perf_counter_ns() - self.t0
+
+def write_stats(path: str) -> None:
+    """Dump `STATS` to path: JSON for *.json, Prometheus text exposition otherwise."""
+    with open(path, "w") as f: f.write(STATS.to_json() if path.lower().endswith(".json") else STATS.to_prometheus())
+
+def _frame_key(fr) -> str:
+    return f"{fr.f_code.co_filename}:{fr.f_code.co_firstlineno}({fr.f_code.co_name})"
+
+@contextmanager
+def profiling(mode: Optional[str], path: Optional[str] = None, *, interval: float = 0.005, top: int = 25):
+    """mode "cprofile": deterministic profile of the block (pstats file at `path`, top functions by
+    cumulative time on stderr). mode "sample": a thread samples the calling thread's stack every
+    `interval` seconds; self/inclusive sample counts per function go to `path` (JSON) and stderr.
+    None/"" is a no-op."""
+    if not mode: yield; return
+    if mode == "cprofile":
+        import cProfile, pstats
+        prof = cProfile.Profile(); prof.enable()
+        try: yield
+        finally:
+            prof.disable()
+            if path: prof.dump_stats(path)
+            pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(top)
+        return
+    if mode != "sample": raise ValueError(f"unknown profile mode {mode!r}")
+    target = threading.get_ident(); stop = threading.Event(); own: Counter = Counter(); incl: Counter = Counter(); n = [0]
+    def sampler():
+        while not stop.wait(interval):
+            fr = sys._current_frames().get(target)
+            if fr is None: continue
+            n[0] += 1; own[_frame_key(fr)] += 1; seen = set()
+            while fr is not None:
+                k = _frame_key(fr)
+                if k not in seen: seen.add(k); incl[k] += 1
+                fr = fr.f_back
+    th = threading.Thread(target=sampler, daemon=True); th.start()
+    try: yield
+    finally:
+        stop.set(); th.join()
+        res = {"interval": interval, "samples": n[0], "self": own.most_common(top), "inclusive": incl.most_common(top)}
+        if path:
+            with open(path, "w") as f: json.dump(res, f, indent=2)
+        print(f"[profile] {n[0]} samples @ {interval * 1000:g} ms; top self:", file=sys.stderr)
+        for k, c in res["self"]: print(f"{c:8d}  {k}", file=sys.stderr)
@@ -0,0 +1,34 @@
+"""SHA-256 Merkle tree over canonical record payloads (RFC 6962 style: 0x00 leaf / 0x01 node
+prefixes, an unpaired last node is promoted to the next level unchanged)."""
+from typing import List
+import hashlib, json
+
+def canonical(obj) -> bytes:
+    return json.dumps(obj, sort_keys=True).encode("utf-8")
+
+def leaf_hash(payload: dict) -> bytes:
+    return hashlib.sha256(b"\x00" + canonical(payload)).digest()
+
+def _node(l: bytes, r: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + l + r).digest()
+
+def build(leaves: List[bytes]):
+    """Return (root, paths): paths[i] lists the hex sibling hashes from leaf i up to the root."""
+    if not leaves: return hashlib.sha256(b"").digest(), []
+    paths: List[List[str]] = [[] for _ in leaves]; pos = list(range(len(leaves))); level = list(leaves)
+    while len(level) > 1:
+        for i, p in enumerate(pos):
+            sib = p ^ 1
+            if sib < len(level): paths[i].append(level[sib].hex())
+            pos[i] = p // 2
+        level = [_node(level[j], level[j + 1]) if j + 1 < len(level) else level[j] for j in range(0, len(level), 2)]
+    return level[0], paths
+
+def root_from_path(leaf: bytes, index: int, size: int, path: List[str]) -> bytes:
+    h = leaf; sibs = iter(bytes.fromhex(s) for s in path)
+    while size > 1:
+        if index % 2: h = _node(next(sibs), h)
+        elif index + 1 < size: h = _node(h, next(sibs))
+        index //= 2; size = (size + 1) // 2
+    if next(sibs, None) is not None: raise ValueError("inclusion path too long")
+    return h
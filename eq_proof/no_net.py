@@ -1,8 +1,14 @@
 
 import os, socket
+_AF_UNIX = getattr(socket, "AF_UNIX", None)
 class _NoNetSocket(socket.socket):
-    def connect(self, *a, **k): raise RuntimeError("Outbound network disabled by eq_proof.no_net")
-    def connect_ex(self, *a, **k): raise RuntimeError("Outbound network disabled by eq_proof.no_net")
+    # Unix domain sockets are local IPC (e.g. the eq_proof.service daemon), not network
+    def connect(self, *a, **k):
+        if _AF_UNIX is not None and self.family == _AF_UNIX: return super().connect(*a, **k)
+        raise RuntimeError("Outbound network disabled by eq_proof.no_net")
+    def connect_ex(self, *a, **k):
+        if _AF_UNIX is not None and self.family == _AF_UNIX: return super().connect_ex(*a, **k)
+        raise RuntimeError("Outbound network disabled by eq_proof.no_net")
 def enforce():
     if os.environ.get("EQPROOF_ALLOW_NET","0") not in ("1","true","True"):
         socket.socket = _NoNetSocket  # type: ignore
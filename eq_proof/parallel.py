@@ -0,0 +1,47 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import os
+from . import no_net as _no_net  # noqa: F401
+from .spec import Spec, spec_dict
+from .compiled import compile_spec
+from .stream import chunked, process_chunk
+from .instrument import STATS
+
+_WORKER: Dict[str, Any] = {}
+
+def _init_worker(sd: Dict[str, Any], opts: Dict[str, Any]) -> None:
+    """Process-pool initializer: build and compile the spec once per worker (and open its own
+    connection to the result cache, if any)."""
+    opts = dict(opts); cache = opts.pop("cache", None)
+    if cache is not None:
+        from .cache import ResultCache
+        opts["cache"] = ResultCache(cache[0], max_bytes=cache[1], engine=cache[2])
+    _WORKER.update(spec=compile_spec(Spec(**sd)), spec_dict=sd, opts=opts)
+
+def _repair_chunk(records: List[Dict[str, Any]]):
+    """process_chunk result plus the worker's stats for the chunk (merged into the parent's STATS)."""
+    return process_chunk(_WORKER["spec"], _WORKER["spec_dict"], records, **_WORKER["opts"]), STATS.drain()
+
+def repair_parallel_chunks(spec, records: Iterable[Dict[str, Any]], *, workers: Optional[int] = None, chunk_size: int = 2000,
+                           sign: bool = True, batch_attest: bool = False, inputs_path: str = "", validate: bool = False, cache=None):
+    """Fan chunks of `records` out to a process pool; repair and signing run in the workers.
+    Yields `process_chunk` results in input order, keeping at most 2*workers chunks in flight;
+    worker-side instrumentation stats are merged into this process's `STATS`."""
+    def take(fut):
+        res, raw = fut.result(); STATS.merge(raw); return res
+    workers = workers or os.cpu_count() or 1
+    opts = {"sign": sign, "batch_attest": batch_attest, "inputs_path": inputs_path, "validate": validate,
+            "cache": (cache.path, cache.max_bytes, cache.engine) if cache is not None else None}
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(spec_dict(spec), opts)) as ex:
+        pending: deque = deque()
+        for chunk in chunked(records, chunk_size):
+            pending.append(ex.submit(_repair_chunk, chunk))
+            if len(pending) >= 2 * workers: yield take(pending.popleft())
+        while pending: yield take(pending.popleft())
+
+def repair_parallel(spec, records: Iterable[Dict[str, Any]], *, workers: Optional[int] = None, chunk_size: int = 2000,
+                    sign: bool = True, inputs_path: str = "") -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """Per-record view of `repair_parallel_chunks`: yields (result, attestation) in input order."""
+    for _, pairs in repair_parallel_chunks(spec, records, workers=workers, chunk_size=chunk_size, sign=sign, inputs_path=inputs_path):
+        yield from pairs
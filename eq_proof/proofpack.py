@@ -0,0 +1,193 @@
+"""Compact proof container (.eqpb). Attestations are stored in a canonical binary encoding with the
+embedded spec lifted out and written once per file (keyed by `spec_hash`); the reader rebuilds the
+exact attestation dict, so signatures verify with `verify.py` as before.
+
+File layout (little-endian):
+
+    b"EQPB" u8 version, 3 reserved bytes
+    entries: u32 length, u8 kind, body       kind S = spec, R = record, H = batch header,
+                                             K = strings first used by the next entry;
+                                             R/H body = u32 spec number (0xffffffff: none) + value
+    index:   u64 offsets of the R, S, H, K entries
+    trailer: u64 index offset, u32 #R, u32 #S, u32 #H, u32 #K, b"EQPI"
+
+Values: tag byte, then None/False/True (no payload), int64, big int (decimal text), float64, str
+(varint length + UTF-8), list, float64 array (lists of 1+ floats), dict (keys sorted, as str
+values), string reference (varint number in the file's string table). In R/H entries every dict
+key and every string of up to 48 bytes is a reference; the table (all K entries in order) is
+loaded when the file is opened, so any record decodes on its own. A file whose trailer is missing
+(writer interrupted) is re-indexed by scanning its entries."""
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import json, mmap, os, struct, sys
+from . import no_net as _no_net  # noqa: F401
+from .spec import spec_hash
+
+EXT = ".eqpb"
+MAGIC, VERSION, TRAILER = b"EQPB", 1, b"EQPI"
+_HEAD = MAGIC + bytes([VERSION, 0, 0, 0])
+_TAIL = struct.Struct("<QIIII4s")
+_KINDS = b"RSHK"
+_NONE_SPEC = 0xFFFFFFFF
+_N, _F, _T, _I, _BIG, _D, _S, _L, _A, _M, _R = range(11)
+_INTERN = 48
+_q, _d, _u32 = struct.Struct("<q"), struct.Struct("<d"), struct.Struct("<I")
+
+def _varint(n: int, out: bytearray) -> None:
+    while n > 0x7F: out.append(n & 0x7F | 0x80); n >>= 7
+    out.append(n)
+
+def _str(v: str, out: bytearray, tab: Optional[Dict[str, int]]) -> None:
+    s = v.encode("utf-8")
+    if tab is None or len(s) > _INTERN: out.append(_S); _varint(len(s), out); out += s
+    else: out.append(_R); _varint(tab.setdefault(v, len(tab)), out)
+
+def _enc(v: Any, out: bytearray, tab: Optional[Dict[str, int]] = None) -> None:
+    if v is None: out.append(_N)
+    elif v is True: out.append(_T)
+    elif v is False: out.append(_F)
+    elif type(v) is int:
+        if -(1 << 63) <= v < 1 << 63: out.append(_I); out += _q.pack(v)
+        else: s = str(v).encode(); out.append(_BIG); _varint(len(s), out); out += s
+    elif type(v) is float: out.append(_D); out += _d.pack(v)
+    elif isinstance(v, str): _str(v, out, tab)
+    elif isinstance(v, (list, tuple)):
+        if v and all(type(x) is float for x in v):
+            a = array("d", v)
+            if sys.byteorder == "big": a.byteswap()
+            out.append(_A); _varint(len(v), out); out += a.tobytes()
+        else:
+            out.append(_L); _varint(len(v), out)
+            for x in v: _enc(x, out, tab)
+    elif isinstance(v, dict):
+        out.append(_M); _varint(len(v), out)
+        for k in sorted(v):
+            if not isinstance(k, str): raise TypeError(f"proof keys must be strings, got {k!r}")
+            _str(k, out, tab); _enc(v[k], out, tab)
+    else: raise TypeError(f"cannot encode {type(v).__name__} in a proof")
+
+def encode(v: Any) -> bytes:
+    """Canonical binary encoding of a JSON-like value (equal values give equal bytes)."""
+    out = bytearray(); _enc(v, out); return bytes(out)
+
+def _dec(b, p: int, tab: List[str]) -> Tuple[Any, int]:
+    t = b[p]; p += 1
+    if t == _D: return _d.unpack_from(b, p)[0], p + 8
+    if t >= _BIG:
+        n = s = 0
+        while True:
+            c = b[p]; p += 1; n |= (c & 0x7F) << s; s += 7
+            if c < 0x80: break
+        if t == _R: return tab[n], p
+        if t == _S: return str(b[p:p + n], "utf-8"), p + n
+        if t == _A:
+            a = array("d"); a.frombytes(b[p:p + 8 * n])
+            if sys.byteorder == "big": a.byteswap()
+            return a.tolist(), p + 8 * n
+        if t == _L:
+            out = []
+            for _ in range(n): x, p = _dec(b, p, tab); out.append(x)
+            return out, p
+        if t == _M:
+            d = {}
+            for _ in range(n):
+                k, p = _dec(b, p, tab); d[k], p = _dec(b, p, tab)
+            return d, p
+        return int(b[p:p + n]), p + n
+    if t == _I: return _q.unpack_from(b, p)[0], p + 8
+    if t <= _T: return (None, False, True)[t], p
+    raise ValueError(f"bad proof value tag {t} at {p - 1}")
+
+def decode(b, pos: int = 0, strings: Optional[List[str]] = None) -> Any:
+    """Inverse of `encode`; `strings` resolves string references (see `ProofReader.strings`)."""
+    return _dec(b, pos, strings or [])[0]
+
+class ProofWriter:
+    """Append attestations (`add`) and batch headers (`add_header`) to an .eqpb file; `close` writes the index."""
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.f = open(path, "wb"); self.f.write(_HEAD); self.pos = len(_HEAD)
+        self.offsets: Dict[int, List[int]] = {k: [] for k in _KINDS}
+        self._specs: Dict[str, int] = {}; self._by_id: Dict[int, Tuple[dict, int]] = {}; self._strings: Dict[str, int] = {}
+    def _entry(self, kind: int, body: bytes) -> None:
+        self.offsets[kind].append(self.pos)
+        self.f.write(_u32.pack(len(body) + 1)); self.f.write(bytes([kind])); self.f.write(body); self.pos += len(body) + 5
+    def _spec_no(self, spec: Optional[dict]) -> int:
+        if spec is None: return _NONE_SPEC
+        hit = self._by_id.get(id(spec))  # attestations of one chunk share the spec dict: hash it once
+        if hit is not None and hit[0] is spec: return hit[1]
+        h = spec_hash(spec); no = self._specs.get(h)
+        if no is None:
+            no = self._specs[h] = len(self._specs); self._entry(ord("S"), encode(spec))
+        self._by_id[id(spec)] = (spec, no); return no
+    def _add(self, kind: int, att: Dict[str, Any]) -> int:
+        no = self._spec_no(att.get("spec")); known = len(self._strings); out = bytearray(_u32.pack(no))
+        _enc({k: v for k, v in att.items() if k != "spec"}, out, self._strings)
+        if len(self._strings) > known: self._entry(ord("K"), encode(list(self._strings)[known:]))
+        self._entry(kind, bytes(out))
+        return len(self.offsets[kind]) - 1
+    def add(self, att: Dict[str, Any]) -> int:
+        """Append one attestation (per record or batch record); returns its record number."""
+        return self._add(ord("R"), att)
+    def add_header(self, header: Dict[str, Any]) -> int:
+        return self._add(ord("H"), header)
+    def close(self) -> None:
+        if self.f.closed: return
+        start = self.pos
+        for kind in _KINDS: self.f.write(struct.pack(f"<{len(self.offsets[kind])}Q", *self.offsets[kind]))
+        self.f.write(_TAIL.pack(start, *(len(self.offsets[k]) for k in _KINDS), TRAILER)); self.f.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+class ProofReader:
+    """Memory-mapped .eqpb reader: `len`, `attestation(i)` / `reader[i]` decode one record only,
+    iteration yields all records in order; `headers()` lists batch headers. Specs are decoded once
+    and shared by the attestations that reference them."""
+    def __init__(self, path: str):
+        self.path = path; self.f = open(path, "rb")
+        self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+        if self.mm[:4] != MAGIC: raise ValueError(f"{path}: not an {EXT} proof file")
+        if self.mm[4] != VERSION: raise ValueError(f"{path}: unsupported {EXT} version {self.mm[4]}")
+        self.offsets = self._index(); self._specs: Dict[int, dict] = {}
+        self.strings: List[str] = [s for p in self.offsets[ord("K")] for s in decode(self.mm, p + 5)]
+    def _index(self) -> Dict[int, List[int]]:
+        mm = self.mm
+        if len(mm) >= len(_HEAD) + _TAIL.size and mm[-4:] == TRAILER:
+            start, *counts, _ = _TAIL.unpack_from(mm, len(mm) - _TAIL.size); out = {}
+            for kind, n in zip(_KINDS, counts):
+                out[kind] = list(struct.unpack_from(f"<{n}Q", mm, start)); start += 8 * n
+            return out
+        out, p = {k: [] for k in _KINDS}, len(_HEAD)  # no trailer: scan the entries
+        while p + 5 <= len(mm):
+            n = _u32.unpack_from(mm, p)[0]
+            if mm[p + 4] not in out or p + 4 + n > len(mm): break
+            out[mm[p + 4]].append(p); p += 4 + n
+        return out
+    def __len__(self) -> int: return len(self.offsets[ord("R")])
+    def spec(self, no: int) -> dict:
+        s = self._specs.get(no)
+        if s is None: s = self._specs[no] = decode(self.mm, self.offsets[ord("S")][no] + 5)
+        return s
+    def _get(self, kind: int, i: int) -> Dict[str, Any]:
+        p = self.offsets[kind][i] + 5; no = _u32.unpack_from(self.mm, p)[0]
+        att = decode(self.mm, p + 4, self.strings)
+        if no != _NONE_SPEC: att["spec"] = self.spec(no)
+        return att
+    def attestation(self, i: int) -> Dict[str, Any]:
+        return self._get(ord("R"), i)
+    __getitem__ = attestation
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)): yield self._get(ord("R"), i)
+    def headers(self) -> List[Dict[str, Any]]:
+        return [self._get(ord("H"), i) for i in range(len(self.offsets[ord("H")]))]
+    def close(self) -> None:
+        if isinstance(self.mm, mmap.mmap): self.mm.close()
+        self.f.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+def to_jsonl(path: str, out: str) -> int:
+    """Expand an .eqpb file back into JSONL attestations (one per line); returns the record count."""
+    with ProofReader(path) as r, open(out, "w") as f:
+        for att in r: f.write(json.dumps(att, sort_keys=True) + "\n")
+        return len(r)
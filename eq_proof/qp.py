@@ -22,3 +22,59 @@ def alternating_proj_equality_bounds(x0: List[float],
             if hi is not None and x[idx] > hi: x[idx]=hi
         if np.linalg.norm(x-prev) <= tol: break
     return list(map(float, x))
+
+def _rows(X, A) -> np.ndarray:
+    """X @ A.T as one identical matrix-vector product per row: a plain (N, n) @ (n, m) lets BLAS pick
+    its blocking from N, so a row's rounding would depend on the rows batched with it."""
+    return np.matmul(X[:, None, :], A.T)[:, 0, :]
+
+class ProjectionSystem:
+    """Euclidean projection onto {E x = e, G x <= g, lo <= x <= hi} by Dykstra's algorithm.
+
+    E is factored once (pseudo-inverse, i.e. E^T (E E^T)^+, so redundant rows are fine) and the
+    system is reused across calls; `project` runs on an (N, n) matrix of points at once, with
+    per-row right-hand sides. Half-space corrections are kept as one multiplier per row and
+    inequality, so memory is O(N * (n + rows)). Row products go through `_rows` so each
+    row's result is bit-identical whatever the batch size, i.e. equal to projecting it alone."""
+    def __init__(self, E, G, lo, hi):
+        self.n = len(lo)
+        self.E = np.asarray(E, dtype=float).reshape(-1, self.n)
+        self.G = np.asarray(G, dtype=float).reshape(-1, self.n)
+        self.Epinv = np.linalg.pinv(self.E) if len(self.E) else None
+        self.Gn2 = np.einsum("ij,ij->i", self.G, self.G)
+        self.lo = np.asarray(lo, dtype=float); self.hi = np.asarray(hi, dtype=float)
+
+    def violation(self, X, e, g) -> np.ndarray:
+        """Largest constraint violation per row."""
+        v = np.maximum(np.max(self.lo - X, axis=1, initial=0.0), np.max(X - self.hi, axis=1, initial=0.0))
+        if len(self.E): v = np.maximum(v, np.max(np.abs(_rows(X, self.E) - e), axis=1))
+        if len(self.G): v = np.maximum(v, np.max(_rows(X, self.G) - g, axis=1, initial=0.0))
+        return v
+
+    def project(self, X0, e=None, g=None, *, iters: int = 1000, tol: float = 1e-10):
+        """Project every row of X0. `e`/`g` broadcast to (N, rows). Returns (X, stats) with per-row
+        iteration counts, convergence flags and final violations. Dykstra's corrections always start
+        at zero: carried over from another point they would converge to a different point than the
+        projection."""
+        X = np.array(X0, dtype=float, ndmin=2); N = len(X)
+        e = np.broadcast_to(np.zeros(len(self.E)) if e is None else np.asarray(e, dtype=float), (N, len(self.E)))
+        g = np.broadcast_to(np.zeros(len(self.G)) if g is None else np.asarray(g, dtype=float), (N, len(self.G)))
+        its = np.zeros(N, dtype=int); conv = np.zeros(N, dtype=bool); act = np.arange(N)
+        x, pb, t, ea, ga = X.copy(), np.zeros_like(X), np.zeros((N, len(self.G))), e, g
+        with np.errstate(all="ignore"):
+            for k in range(1, iters + 1):
+                prev = x
+                if len(self.E): x = x - _rows(_rows(x, self.E) - ea, self.Epinv)
+                for j in range(len(self.G)):
+                    y = x + t[:, j, None] * self.G[j]
+                    t[:, j] = np.maximum(_rows(y, self.G[j:j + 1])[:, 0] - ga[:, j], 0.0) / self.Gn2[j] if self.Gn2[j] > 0 else 0.0
+                    x = y - t[:, j, None] * self.G[j]
+                y = x + pb; x = np.clip(y, self.lo, self.hi); pb = y - x
+                done = np.max(np.abs(x - prev), axis=1, initial=0.0) <= tol
+                if done.any() or k == iters:
+                    fin = done if k < iters else np.ones(len(x), dtype=bool)
+                    X[act[fin]] = x[fin]; its[act[fin]] = k; conv[act[fin]] = done[fin]
+                    keep = ~fin; act = act[keep]
+                    if not len(act): break
+                    x, pb, t, ea, ga = x[keep], pb[keep], t[keep], ea[keep], ga[keep]
+        return X, {"iterations": its, "converged": conv, "max_violation": self.violation(X, e, g)}
@@ -1,16 +1,52 @@
 
-from typing import Dict, Tuple, List
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from . import no_net as _no_net  # noqa: F401
 
-def project_simplex(y: List[float]) -> List[float]:
-    u = sorted(y, reverse=True)
-    cssv, csum, rho = [], 0.0, -1
-    for i, ui in enumerate(u):
-        csum += ui; cssv.append(csum)
-        t = (cssv[i] - 1.0) / (i + 1)
-        if ui - t > 0: rho = i
-    theta = (cssv[rho] - 1.0) / (rho + 1)
-    return [max(0.0, yi - theta) for yi in y]
+def project_simplex(y: List[float], z: float = 1.0, w: Optional[List[float]] = None) -> List[float]:
+    """Euclidean (or, with weights `w`, weighted) projection of y onto {x >= 0, sum x = z}."""
+    return project_simplex_rows(np.asarray([y], dtype=float), z, None if w is None else np.asarray([w], dtype=float))[0].tolist()
+
+def project_simplex_rows(Y: np.ndarray, z: float = 1.0, W: Optional[np.ndarray] = None) -> np.ndarray:
+    """`project_simplex` applied to every row of an (N, n) matrix; O(n log n) per row (one sort).
+    With weights W (> 0, same shape) each row minimizes sum w (x - y)^2, i.e. x = max(0, y - theta / w)."""
+    Y = np.asarray(Y, dtype=float)
+    if Y.size == 0: return Y.copy()
+    if W is None:
+        u = -np.sort(-Y, axis=1); cssv = np.cumsum(u, axis=1)
+        ok = u - (cssv - z) / np.arange(1, Y.shape[1] + 1) > 0
+        rho = Y.shape[1] - 1 - np.argmax(ok[:, ::-1], axis=1)
+        theta = (cssv[np.arange(len(Y)), rho] - z) / (rho + 1)
+        d = Y - theta[:, None]
+        return np.where(d > 0, d, 0.0)
+    W = np.broadcast_to(np.asarray(W, dtype=float), Y.shape)
+    if not (W > 0).all(): raise ValueError("simplex weights must be positive")
+    # breakpoints t = w*y: x_i > 0 iff t_i > theta; theta over the k largest t is (sum y - z) / sum 1/w
+    order = np.argsort(-(Y * W), axis=1, kind="stable"); t = np.take_along_axis(Y * W, order, axis=1)
+    theta_k = (np.cumsum(np.take_along_axis(Y, order, axis=1), axis=1) - z) / np.cumsum(np.take_along_axis(1.0 / W, order, axis=1), axis=1)
+    rho = Y.shape[1] - 1 - np.argmax((t > theta_k)[:, ::-1], axis=1)
+    d = Y - theta_k[np.arange(len(Y)), rho][:, None] / W
+    return np.where(d > 0, d, 0.0)
+
+def project_capped_simplex_rows(Y: np.ndarray, U, z=1.0, *, iters: int = 100) -> np.ndarray:
+    """Rows of Y projected onto {0 <= x <= U, sum x = z} (U and z broadcast per row): x = clip(y - theta, 0, U).
+    theta is bracketed by bisection on the piecewise-linear sum (O(n) per step), then solved exactly on
+    the resulting free set. Raises ValueError when some row has z outside [0, sum U]."""
+    Y = np.asarray(Y, dtype=float); U = np.broadcast_to(np.asarray(U, dtype=float), Y.shape); z = np.broadcast_to(np.asarray(z, dtype=float), (len(Y),))
+    if Y.size == 0: return Y.copy()
+    if (U < 0).any() or (z < 0).any() or (z > U.sum(axis=1) * (1 + 1e-12)).any(): raise ValueError("capped simplex is empty: need U >= 0 and 0 <= z <= sum(U)")
+    lo = (Y - U).min(axis=1); hi = Y.max(axis=1)  # sum at lo = sum U >= z, at hi = 0 <= z
+    for _ in range(iters):
+        mid = 0.5 * (lo + hi)
+        if not ((lo < mid) & (mid < hi)).any(): break  # every bracket is down to adjacent floats
+        big = np.clip(Y - mid[:, None], 0.0, U).sum(axis=1) > z
+        lo = np.where(big, mid, lo); hi = np.where(big, hi, mid)
+    D = Y - (0.5 * (lo + hi))[:, None]; free = (D > 0) & (D < U); nf = free.sum(axis=1)
+    theta = np.where(nf > 0, ((Y * free).sum(axis=1) + (U * (D >= U)).sum(axis=1) - z) / np.maximum(nf, 1), 0.5 * (lo + hi))
+    return np.clip(Y - theta[:, None], 0.0, U)
+
+def project_capped_simplex(y: List[float], u, z: float = 1.0) -> List[float]:
+    return project_capped_simplex_rows(np.asarray([y], dtype=float), np.asarray(u, dtype=float), z)[0].tolist()
 
 def clip_bounds(vals: Dict[str, float], b: Dict[str, Tuple[float, float]]):
     out = dict(vals)
@@ -21,13 +57,33 @@ def clip_bounds(vals: Dict[str, float], b: Dict[str, Tuple[float, float]]):
         out[k]=v
     return out
 
+def pav(y, w=None, *, decreasing: bool = False, lower: Optional[float] = None, upper: Optional[float] = None) -> np.ndarray:
+    """(Weighted) isotonic regression by pool-adjacent-violators: a stack of blocks (weighted sum,
+    weight, length), each new point merged into the blocks before it while their mean is larger.
+    O(n) amortized. `decreasing` fits a non-increasing sequence; scalar `lower`/`upper` clip the
+    fit, which is the bounded solution."""
+    y = np.asarray(y, dtype=float)
+    if decreasing:
+        return -pav(-y, w, lower=None if upper is None else -upper, upper=None if lower is None else -lower)
+    if w is None: ws = [1.0] * len(y)
+    else:
+        ws = np.broadcast_to(np.asarray(w, dtype=float), y.shape).tolist()
+        if not all(x > 0 for x in ws): raise ValueError("isotonic weights must be positive")
+    sy, sw, cnt = [], [], []
+    for yi, wi in zip(y.tolist(), ws):
+        a, b, c = yi * wi, wi, 1
+        while sy and sy[-1] * b > a * sw[-1]:  # previous block mean > this block's mean
+            a += sy.pop(); b += sw.pop(); c += cnt.pop()
+        sy.append(a); sw.append(b); cnt.append(c)
+    out = np.repeat(np.divide(sy, sw), cnt) if sy else np.zeros(0)
+    single = np.repeat(np.asarray(cnt) == 1, cnt); out[single] = y[single]  # untouched points stay bit-exact
+    return out if lower is None and upper is None else np.clip(out, lower, upper)
+
+def pav_rows(Y: np.ndarray, W: Optional[np.ndarray] = None, **kw) -> np.ndarray:
+    """`pav` applied to every row of an (N, n) matrix (keyword options as for `pav`)."""
+    Y = np.asarray(Y, dtype=float)
+    return np.array([pav(y, None if W is None else W[i], **kw) for i, y in enumerate(Y)]).reshape(Y.shape)
+
 def isotonic_increasing(seq: List[float]) -> List[float]:
-    y = seq[:]; w=[1.0]*len(y); i=0
-    while i < len(y)-1:
-        if y[i] <= y[i+1]: i+=1; continue
-        j=i
-        while j>=0 and y[j] > y[j+1]:
-            tot=w[j]+w[j+1]; avg=(w[j]*y[j]+w[j+1]*y[j+1])/tot
-            y[j]=y[j+1]=avg; w[j]=w[j+1]=tot; j-=1
-        i+=1
-    return y
+    """Least-squares non-decreasing fit of seq (unit weights)."""
+    return pav(seq).tolist()
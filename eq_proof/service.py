@@ -0,0 +1,156 @@
+"""Local repair daemon: JSON over HTTP on a Unix socket (or a loopback TCP port). Compiled specs
+stay in an LRU keyed by spec hash and signing keys stay in memory, so a request costs only the
+repair and the signature.
+
+  POST /specs         {"spec": {...}}                                            -> {"spec_hash"}
+  POST /repair        {"spec" | "spec_hash", "values", "validate"?}              -> attestation
+  POST /repair_batch  {"spec" | "spec_hash", "records", "validate"?, "batch_attest"?}
+                                                                      -> {"header", "proofs"}
+  GET  /health        -> {"ok", "specs"}
+  GET  /stats         -> Prometheus text (`?format=json` for JSON)
+
+Run: python -m eq_proof.service --socket /tmp/eqproof.sock   (or --port 8765, bound to 127.0.0.1)
+"""
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+import argparse, http.client, json, os, signal, socket, socketserver, stat, sys, threading
+from . import no_net as _no_net  # noqa: F401
+from .spec import spec_from_dict, spec_dict, spec_hash
+from .compiled import CompiledSpec, compile_spec
+from .diagnose import diagnose_and_repair
+from .validation import validate
+from .stream import process_chunk
+from .attest import attest, _secret, _ed25519
+from .instrument import STATS
+
+class SpecCache:
+    """LRU of (CompiledSpec, spec dict) keyed by `spec_hash` of the normalized spec dict."""
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize; self._d: "OrderedDict[str, Tuple[CompiledSpec, Dict[str, Any]]]" = OrderedDict(); self._lock = threading.Lock()
+    def __len__(self): return len(self._d)
+    def get(self, h: str) -> Optional[Tuple[CompiledSpec, Dict[str, Any]]]:
+        with self._lock:
+            hit = self._d.get(h)
+            if hit is not None: self._d.move_to_end(h)
+            return hit
+    def add(self, d: Dict[str, Any]) -> Tuple[str, CompiledSpec, Dict[str, Any]]:
+        spec = spec_from_dict(d); sd = spec_dict(spec); h = spec_hash(sd)
+        hit = self.get(h)
+        if hit is not None: return (h,) + hit
+        cs = compile_spec(spec)  # outside the lock: compiling a large spec can take a while
+        with self._lock:
+            self._d[h] = (cs, sd); self._d.move_to_end(h)
+            while len(self._d) > self.maxsize: self._d.popitem(last=False)
+        return h, cs, sd
+
+class RepairService:
+    """Request handlers behind the daemon (usable in-process too). Raises KeyError/ValueError/TypeError
+    for malformed requests and LookupError for an unknown spec_hash."""
+    def __init__(self, max_specs: int = 64):
+        self.specs = SpecCache(max_specs)
+        _secret(); _ed25519()  # load signing keys now rather than on the first request
+    def _spec(self, body: Dict[str, Any]) -> Tuple[CompiledSpec, Dict[str, Any]]:
+        if "spec" in body: return self.specs.add(body["spec"])[1:]
+        hit = self.specs.get(str(body["spec_hash"]))
+        if hit is None: raise LookupError("unknown spec_hash; POST /specs (or send the spec) first")
+        return hit
+    def register(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return {"spec_hash": self.specs.add(body["spec"])[0]}
+    def repair(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        cs, sd = self._spec(body); values = body["values"]
+        if not isinstance(values, dict): raise TypeError("values must be an object")
+        return attest(sd, (validate if body.get("validate") else diagnose_and_repair)(cs, values))
+    def repair_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        cs, sd = self._spec(body); records = body["records"]
+        if not isinstance(records, list) or not all(isinstance(r, dict) for r in records): raise TypeError("records must be a list of objects")
+        header, pairs = process_chunk(cs, sd, records, batch_attest=bool(body.get("batch_attest")), validate=bool(body.get("validate")))
+        return {"header": header, "proofs": [att for _, att in pairs]}
+    def handle(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Any]:
+        """(HTTP status, JSON-able payload or text) for one request."""
+        route, _, query = path.partition("?")
+        if method == "GET" and route == "/health": return 200, {"ok": True, "specs": len(self.specs)}
+        if method == "GET" and route == "/stats": return 200, STATS.to_dict() if "format=json" in query else STATS.to_prometheus()
+        fn = {"/specs": self.register, "/repair": self.repair, "/repair_batch": self.repair_batch}.get(route) if method == "POST" else None
+        if fn is None: return 404, {"error": f"no route {method} {route}"}
+        try: return 200, fn(body or {})
+        except LookupError as e:
+            if isinstance(e, KeyError): return 400, {"error": f"missing field {e}"}
+            return 404, {"error": str(e)}
+        except (ValueError, TypeError) as e: return 400, {"error": str(e)}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "eq-proof"
+    def log_message(self, fmt, *args): pass
+    def address_string(self): return "local"
+    def _reply(self, code: int, out: Any) -> None:
+        data = out.encode("utf-8") if isinstance(out, str) else json.dumps(out, sort_keys=True).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain; version=0.0.4" if isinstance(out, str) else "application/json")
+        self.send_header("Content-Length", str(len(data))); self.end_headers(); self.wfile.write(data)
+    def do_GET(self): self._reply(*self.server.service.handle("GET", self.path))
+    def do_POST(self):
+        try: body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError: return self._reply(400, {"error": "body is not JSON"})
+        if not isinstance(body, dict): return self._reply(400, {"error": "body must be a JSON object"})
+        try: self._reply(*self.server.service.handle("POST", self.path, body))
+        except Exception as e: self._reply(500, {"error": f"{type(e).__name__}: {e}"})
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def make_server(service: RepairService, *, socket_path: Optional[str] = None, port: int = 0, host: str = "127.0.0.1"):
+    """Bind (but do not start) the daemon: a Unix socket at socket_path, else host:port (loopback only).
+    The socket is created owner-only (0600): whoever can connect gets proofs signed with this node's key.
+    A stale socket at socket_path is replaced; any other file there is an error."""
+    if socket_path:
+        if os.path.lexists(socket_path):
+            if not stat.S_ISSOCK(os.lstat(socket_path).st_mode): raise FileExistsError(f"{socket_path} exists and is not a socket")
+            os.unlink(socket_path)
+        old = os.umask(0o077)
+        try: srv = _UnixHTTPServer(socket_path, _Handler)
+        finally: os.umask(old)
+        os.chmod(socket_path, 0o600)
+    else:
+        if host not in ("127.0.0.1", "::1", "localhost"): raise ValueError("the service only binds loopback addresses")
+        srv = ThreadingHTTPServer((host, port), _Handler)
+    srv.service = service
+    return srv
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path: str, timeout: float = 60.0):
+        super().__init__("localhost", timeout=timeout); self._path = path
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM); self.sock.settimeout(self.timeout); self.sock.connect(self._path)
+
+def call(socket_path: str, path: str, payload: Optional[Dict[str, Any]] = None, *, timeout: float = 60.0) -> Tuple[int, Any]:
+    """Client for the Unix-socket daemon: (status, decoded JSON or text). GET without payload, POST with it."""
+    conn = _UnixConnection(socket_path, timeout)
+    try:
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        conn.request("GET" if body is None else "POST", path, body, {"Content-Type": "application/json"} if body else {})
+        r = conn.getresponse(); data = r.read().decode("utf-8")
+        return r.status, (json.loads(data) if r.getheader("Content-Type", "").startswith("application/json") else data)
+    finally: conn.close()
+
+def main():
+    p = argparse.ArgumentParser(description="EQ-PROOF repair daemon (local only).")
+    g = p.add_mutually_exclusive_group(required=True)
+    g.add_argument("--socket", help="listen on this Unix socket path"); g.add_argument("--port", type=int, help="listen on 127.0.0.1:PORT")
+    p.add_argument("--max-specs", type=int, default=64, help="compiled specs kept in the LRU")
+    p.add_argument("--preload", nargs="*", default=[], help="spec JSON files to compile at startup")
+    a = p.parse_args()
+    svc = RepairService(a.max_specs)
+    for path in a.preload:
+        with open(path) as f: print(f"[spec] {path} → {svc.specs.add(json.load(f))[0]}")
+    srv = make_server(svc, socket_path=a.socket, port=a.port or 0)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # unwind through `finally` so the socket file is removed
+    print(f"[OK] serving on {a.socket or '127.0.0.1:%d' % srv.server_address[1]}", flush=True)
+    try: srv.serve_forever()
+    except KeyboardInterrupt: pass
+    finally:
+        srv.server_close()
+        if a.socket and os.path.exists(a.socket): os.unlink(a.socket)
+
+if __name__ == "__main__": main()
@@ -1,7 +1,7 @@
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Any
-import json
+import json, hashlib
 from . import no_net as _no_net  # noqa: F401
 
 @dataclass
@@ -16,7 +16,17 @@ class Spec:
 
 def load_spec(path: str) -> "Spec":
     with open(path, "r") as f:
-        d = json.load(f)
+        return spec_from_dict(json.load(f))
+
+def spec_from_dict(d: Dict[str, Any]) -> "Spec":
     for k in ["name","version","variables","constraints"]:
         if k not in d: raise ValueError(f"Spec missing {k}")
     return Spec(d["name"], d["version"], d["variables"], d["constraints"], d.get("probes",[]), d.get("alternates",[]), d.get("units",{}))
+
+def spec_dict(spec) -> Dict[str, Any]:
+    """Plain-dict form of a Spec (or CompiledSpec), as embedded in attestations."""
+    return asdict(getattr(spec, "spec", spec))
+
+def spec_hash(sd: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON of a spec dict (as in attestation meta.spec_hash)."""
+    return hashlib.sha256(json.dumps(sd, sort_keys=True).encode("utf-8")).hexdigest()
@@ -0,0 +1,146 @@
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import csv, json, os
+from . import no_net as _no_net  # noqa: F401
+from .compiled import compile_spec
+from .batch import diagnose_and_repair_batch
+from .validation import validate_batch
+from .attest import attest, attest_batch, signer_id
+from .spec import spec_dict, spec_hash
+from .instrument import STATS
+from .cache import attestation
+from .tables import parse_cell, table_columns, table_format, read_table, TableWriter
+
+def record_format(path: str) -> str:
+    """"csv" for .csv files, "parquet"/"arrow"/"xlsx" for those tables (see `tables`), "jsonl" otherwise."""
+    return "csv" if os.path.splitext(path)[1].lower() == ".csv" else table_format(path) or "jsonl"
+
+def read_records(path: str, fmt: Optional[str] = None, *, numeric: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield one record per JSON line, or per CSV/Parquet/Arrow/XLSX row (header = variable names,
+    empty cells omitted). Text cells of the `numeric` columns (normally `spec_columns`) are parsed as
+    numbers, other cells keep their text (or stored table type); numeric=None parses every CSV cell
+    that looks like a number and no table cell (those are typed already)."""
+    fmt = fmt or record_format(path)
+    if fmt not in ("csv", "jsonl"):
+        for chunk in read_table(path, fmt, numeric=numeric or ()): yield from chunk
+        return
+    with open(path, newline="") as f:
+        if fmt == "csv":
+            num = None if numeric is None else set(numeric)
+            for row in csv.DictReader(f):
+                yield {k: parse_cell(v) if num is None or k in num else v for k, v in row.items() if k and v not in ("", None)}
+        else:
+            for line in f:
+                if line.strip(): yield json.loads(line)
+
+def spec_columns(spec) -> List[str]:
+    """Every column the spec reads (its variables, constraint variables, caps): `read_records(numeric=...)`."""
+    from .batch import _columns
+    cols, optional = _columns(compile_spec(spec)); return cols + optional
+
+def record_columns(path: str, spec=None, fmt: Optional[str] = None) -> Optional[List[str]]:
+    """Column order for writing repaired records like `path`: the input's header or table columns
+    (None for JSONL), then any `spec` variable it lacks."""
+    fmt = fmt or record_format(path)
+    if fmt == "jsonl": return None
+    if fmt == "csv":
+        with open(path, newline="") as f: cols = [k for k in next(csv.reader(f), []) if k]
+    else: cols = table_columns(path, fmt)
+    return cols + [v for v in (spec.variables if spec is not None else ()) if v not in cols]
+
+def record_writer(out: str, inputs: str, spec=None) -> "RecordWriter":
+    """`RecordWriter` for the repaired records of `inputs`: the input's columns (`record_columns`), with
+    spec variables as float columns and, for Parquet/Arrow, the other column types of the input schema."""
+    return RecordWriter(out, columns=record_columns(inputs, spec), floats=spec.variables if spec is not None else (), like=inputs)
+
+def chunked(it: Iterable, size: int) -> Iterator[List]:
+    it = iter(it)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk: return
+        yield chunk
+
+Pair = Tuple[Dict[str, Any], Optional[Dict[str, Any]]]
+
+def process_chunk(cs, sd: Dict[str, Any], records: List[Dict[str, Any]], *, sign: bool = True, batch_attest: bool = False,
+                  inputs_path: str = "", validate: bool = False, cache=None) -> Tuple[Optional[Dict[str, Any]], List[Pair]]:
+    """Repair one chunk and sign it: per record (`attest`) or once for the chunk (`attest_batch`,
+    whose signed header is returned first; it is None otherwise). validate=True checks first and
+    only repairs violating records (`validate_batch`).
+
+    With a `cache.ResultCache`, records seen before reuse their stored result and, when signed per
+    record by the current key, their attestation; only the rest are repaired/signed and stored."""
+    run = validate_batch if validate else diagnose_and_repair_batch
+    if cache is None:
+        results = run(cs, records); hits: List[Any] = [None] * len(records)
+    else:
+        sh = spec_hash(sd); mode = "validate" if validate else "repair"
+        hits = cache.get_many(sh, records, mode); miss = [r for r, h in zip(records, hits) if h is None]
+        fresh = iter(run(cs, miss) if miss else ())
+        results = [h[0] if h is not None else next(fresh) for h in hits]
+        STATS.record(cs.name, {}, {("cache", "hit"): len(records) - len(miss), ("cache", "miss"): len(miss)}, 0, "cache")
+    header = None; reuse = [False] * len(records)
+    if not sign: atts: List[Any] = [None] * len(records)
+    elif batch_attest: header, atts = attest_batch(sd, results, inputs_path=inputs_path)
+    else:
+        sid = signer_id()
+        reuse = [h is not None and h[1] is not None and h[2] == sid for h in hits]
+        atts = [attestation(sd, res, h[1]) if ok else attest(sd, res, inputs_path=inputs_path) for h, res, ok in zip(hits, results, reuse)]
+    if cache is not None:
+        per = sign and not batch_attest  # batch records carry chunk-specific Merkle paths: cache the result only
+        cache.put_many(sh, [(r, res, att if per else None, sid if per else None) for r, h, res, att, ok in zip(records, hits, results, atts, reuse)
+                            if h is None or (per and not ok)], mode)
+    return header, list(zip(results, atts))
+
+def repair_one(spec, values: Dict[str, Any], *, validate: bool = False, cache=None, spec_path: str = "", inputs_path: str = "") -> Pair:
+    """(result, attestation) for one record: the scalar engine, or `process_chunk` when a result cache is given."""
+    cs = compile_spec(spec); sd = spec_dict(cs)
+    if cache is not None: return process_chunk(cs, sd, [values], validate=validate, cache=cache, inputs_path=inputs_path)[1][0]
+    from .diagnose import diagnose_and_repair
+    from .validation import validate as _validate
+    res = (_validate if validate else diagnose_and_repair)(cs, values, spec_path=spec_path, inputs_path=inputs_path)
+    return res, attest(sd, res, spec_path=spec_path, inputs_path=inputs_path)
+
+def repair_chunks(spec, records: Iterable[Dict[str, Any]], *, chunk_size: int = 10000, sign: bool = True,
+                  batch_attest: bool = False, inputs_path: str = "", workers: int = 1, validate: bool = False,
+                  cache=None) -> Iterator[Tuple[Optional[Dict[str, Any]], List[Pair]]]:
+    """Repair `records` chunk by chunk with the batch engine, yielding (batch header, [(result, attestation)])
+    in input order. Only one chunk is held in memory at a time; workers > 1 hands chunks to `repair_parallel_chunks`.
+    `cache` (a `cache.ResultCache`) is consulted per chunk, see `process_chunk`."""
+    if workers > 1:
+        from .parallel import repair_parallel_chunks
+        yield from repair_parallel_chunks(spec, records, workers=workers, chunk_size=chunk_size, sign=sign,
+                                          batch_attest=batch_attest, inputs_path=inputs_path, validate=validate, cache=cache)
+        return
+    cs = compile_spec(spec); sd = spec_dict(cs)
+    for chunk in chunked(records, chunk_size):
+        yield process_chunk(cs, sd, chunk, sign=sign, batch_attest=batch_attest, inputs_path=inputs_path, validate=validate, cache=cache)
+
+def repair_stream(spec, records: Iterable[Dict[str, Any]], *, chunk_size: int = 10000, sign: bool = True,
+                  inputs_path: str = "", workers: int = 1, validate: bool = False) -> Iterator[Pair]:
+    """Per-record view of `repair_chunks`: yields (result, attestation) in input order."""
+    for _, pairs in repair_chunks(spec, records, chunk_size=chunk_size, sign=sign, inputs_path=inputs_path, workers=workers, validate=validate):
+        yield from pairs
+
+class RecordWriter:
+    """Incremental JSONL/CSV writer for repaired records; Parquet/Arrow/XLSX go through `tables.TableWriter`
+    (`floats`, `like`: see there). The header is `columns` (see `record_writer`), else the first record's
+    keys; a record with a key outside the header raises ValueError rather than losing that value."""
+    def __init__(self, path: str, fmt: Optional[str] = None, *, columns: Optional[List[str]] = None, floats: Iterable[str] = (),
+                 like: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.fmt = fmt or record_format(path); self._w = None; self.columns = columns
+        self.f = (TableWriter(path, self.fmt, columns=columns, floats=floats, like=like) if self.fmt not in ("csv", "jsonl")
+                  else open(path, "w", newline=""))
+    def write(self, rec: Dict[str, Any]) -> None:
+        if isinstance(self.f, TableWriter): self.f.write(rec)
+        elif self.fmt == "csv":
+            if self._w is None:
+                self._w = csv.DictWriter(self.f, fieldnames=list(self.columns or rec)); self._w.writeheader()
+            try: self._w.writerow(rec)
+            except ValueError: raise ValueError(f"record has columns missing from the CSV header {self._w.fieldnames}: {sorted(set(rec) - set(self._w.fieldnames))}") from None
+        else:
+            self.f.write(json.dumps(rec) + "\n")
+    def close(self) -> None: self.f.close()
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
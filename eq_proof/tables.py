@@ -0,0 +1,152 @@
+"""Wide record tables for streaming: one record per row, one column per variable. Parquet and Arrow
+IPC (pyarrow, optional) are read one record batch at a time, XLSX (openpyxl, optional) through a
+read-only worksheet stream; writers append repaired records in the same format. As for CSV (see
+`stream.read_records`), null/empty cells are left out of the record, text cells of the `numeric`
+columns (the spec's) are read as numbers while every other cell keeps its stored type, and a row
+with no values is an empty record, so output rows line up with input rows."""
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import os
+from . import no_net as _no_net  # noqa: F401
+
+FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".xlsx": "xlsx", ".xlsm": "xlsx"}
+
+def table_format(path: str) -> Optional[str]:
+    """"parquet", "arrow" or "xlsx" from the file extension; None for anything else."""
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+def _pyarrow():
+    try:
+        import pyarrow as pa, pyarrow.ipc, pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("pyarrow not available for Parquet/Arrow files (pip install pyarrow)")
+    return pa
+
+def _openpyxl():
+    try: import openpyxl
+    except ImportError: raise RuntimeError("openpyxl not available for XLSX files (pip install openpyxl)")
+    return openpyxl
+
+def parse_cell(v):
+    """Numeric text as a float; anything else unchanged."""
+    if isinstance(v, str):
+        try: return float(v)
+        except ValueError: return v
+    return v
+
+def _record(names, row, numeric) -> Dict[str, Any]:
+    return {k: parse_cell(v) if k in numeric else v for k, v in zip(names, row) if k and v is not None and v != ""}
+
+def _xlsx_rows(path: str, sheet: Optional[str]):
+    wb = _openpyxl().load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = (wb[sheet] if sheet else wb.active).iter_rows(values_only=True)
+        yield [None if h is None else str(h) for h in next(rows, ())]
+        yield from rows
+    finally: wb.close()
+
+def _arrow_schema(path: str, fmt: str):
+    pa = _pyarrow()
+    with pa.memory_map(path) as src:
+        if fmt == "parquet": return pa.parquet.ParquetFile(src).schema_arrow
+        try: return pa.ipc.open_file(src).schema
+        except pa.ArrowInvalid: src.seek(0); return pa.ipc.open_stream(src).schema
+
+def table_columns(path: str, fmt: Optional[str] = None, *, sheet: Optional[str] = None) -> List[str]:
+    """Column names of a table: the Arrow/Parquet schema, or the first XLSX row."""
+    fmt = fmt or table_format(path)
+    if fmt == "xlsx": return [h for h in next(_xlsx_rows(path, sheet)) if h]
+    return list(_arrow_schema(path, fmt).names)
+
+def read_table(path: str, fmt: Optional[str] = None, *, chunk_size: int = 10000, sheet: Optional[str] = None,
+               numeric: Iterable[str] = ()) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of at most chunk_size records (one per row); text cells of `numeric` columns are parsed as numbers."""
+    fmt = fmt or table_format(path); numeric = frozenset(numeric)
+    if fmt == "xlsx":
+        rows = _xlsx_rows(path, sheet); header = next(rows); chunk: List[Dict[str, Any]] = []; blank = 0
+        for row in rows:
+            rec = _record(header, row, numeric)
+            if not rec: blank += 1; continue  # empty rows count only if a non-empty row follows
+            chunk += [{} for _ in range(blank)] + [rec]; blank = 0
+            while len(chunk) >= chunk_size: yield chunk[:chunk_size]; chunk = chunk[chunk_size:]
+        if chunk: yield chunk
+        return
+    pa = _pyarrow()
+    if fmt not in ("parquet", "arrow"): raise ValueError(f"unknown table format {fmt!r}")
+    with pa.memory_map(path) as src:
+        if fmt == "parquet": batches = pa.parquet.ParquetFile(src).iter_batches(batch_size=chunk_size)
+        else:
+            try: r = pa.ipc.open_file(src); batches = (r.get_batch(i) for i in range(r.num_record_batches))
+            except pa.ArrowInvalid: src.seek(0); batches = iter(pa.ipc.open_stream(src))
+        for b in batches:
+            cols = b.to_pydict(); names = list(cols)
+            # columns to row dicts; re-sliced so Arrow IPC batches larger than chunk_size are split too
+            recs = [_record(names, row, numeric) for row in zip(*(cols[k] for k in names))]
+            for i in range(0, len(recs), chunk_size): yield recs[i:i + chunk_size]
+
+def output_schema(columns: List[str], floats: Iterable[str] = (), like=None):
+    """Arrow schema for writing `columns`: `floats` (the repaired variables) are float64 unless the
+    input schema `like` already has them as floating point; every other column keeps its type in
+    `like`, or is a string column when `like` does not have it."""
+    pa = _pyarrow(); floats = set(floats); fields = []
+    for c in columns:
+        f = like.field(c) if like is not None and c in like.names else None
+        if f is None: f = pa.field(c, pa.float64() if c in floats else pa.string())
+        elif c in floats and not pa.types.is_floating(f.type): f = pa.field(c, pa.float64())
+        fields.append(f)
+    return pa.schema(fields)
+
+class TableWriter:
+    """Append records to a Parquet/Arrow/XLSX file, `chunk_size` at a time. Columns are `columns`
+    (see `stream.record_writer`), else the keys of the first chunk; a record with a key outside them
+    raises ValueError. The Arrow/Parquet schema is `output_schema(columns, floats, schema of `like`)`,
+    or without `columns` inferred from the first chunk (integer and all-null columns as float64)."""
+    def __init__(self, path: str, fmt: Optional[str] = None, *, chunk_size: int = 10000, columns: Optional[List[str]] = None,
+                 floats: Iterable[str] = (), like: Optional[str] = None):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path, self.fmt, self.chunk_size = path, fmt or table_format(path), chunk_size
+        if self.fmt not in ("parquet", "arrow", "xlsx"): raise ValueError(f"unknown table format {self.fmt!r}")
+        self._buf: List[Dict[str, Any]] = []; self._w = None; self._cols: Optional[List[str]] = list(columns) if columns else None
+        self._schema = None
+        if self._cols and self.fmt != "xlsx":
+            lf = table_format(like) if like else None
+            self._schema = output_schema(self._cols, floats, _arrow_schema(like, lf) if lf in ("parquet", "arrow") else None)
+        if self.fmt == "xlsx":
+            self._wb = _openpyxl().Workbook(write_only=True); self._ws = self._wb.create_sheet()
+            if self._cols: self._ws.append(self._cols)
+        else: _pyarrow()
+    def write(self, rec: Dict[str, Any]) -> None:
+        self._buf.append(rec)
+        if len(self._buf) >= self.chunk_size: self.flush()
+    def flush(self) -> None:
+        if not self._buf: return
+        if self._cols is None:
+            self._cols = list(dict.fromkeys(k for r in self._buf for k in r))
+            if self.fmt == "xlsx": self._ws.append(self._cols)
+        extra = sorted({k for r in self._buf for k in r} - set(self._cols))
+        if extra: raise ValueError(f"{self.path}: records have columns missing from the output {self._cols}: {extra}")
+        if self.fmt == "xlsx":
+            for r in self._buf: self._ws.append([r.get(c) for c in self._cols])
+        else:
+            pa = _pyarrow(); cols = {c: [r.get(c) for r in self._buf] for c in self._cols}
+            if self._schema is None:
+                t = pa.Table.from_pydict(cols)
+                # repaired values are floats: integer (or all-null) columns of the first chunk are widened
+                self._schema = pa.schema([pa.field(f.name, pa.float64()) if pa.types.is_integer(f.type) or pa.types.is_null(f.type) else f for f in t.schema])
+            for f in self._schema:
+                if pa.types.is_string(f.type) or pa.types.is_large_string(f.type):
+                    cols[f.name] = [v if v is None or isinstance(v, str) else str(v) for v in cols[f.name]]
+            try: t = pa.Table.from_pydict(cols, schema=self._schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e: raise ValueError(f"{self.path}: records do not fit the output schema ({e})") from None
+            self._open().write_table(t)
+        self._buf = []
+    def _open(self):
+        if self._w is None:
+            pa = _pyarrow(); self._w = pa.parquet.ParquetWriter(self.path, self._schema) if self.fmt == "parquet" else pa.ipc.new_file(self.path, self._schema)
+        return self._w
+    def close(self) -> None:
+        try: self.flush()
+        finally:
+            if self.fmt == "xlsx": self._wb.save(self.path)
+            elif self._schema is not None: self._open().close()  # known columns: even an empty input gives a readable table
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
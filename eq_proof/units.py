@@ -1,6 +1,7 @@
 
-from typing import Dict, Tuple
-import sympy as sp
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple, Union
+import numpy as np
 
 BASE = {"":((0,0,0,0,0,0,0),1.0),"m":((1,0,0,0,0,0,0),1.0),"kg":((0,1,0,0,0,0,0),1.0),
         "s":((0,0,1,0,0,0,0),1.0),"A":((0,0,0,1,0,0,0),1.0),"K":((0,0,0,0,1,0,0),1.0),
@@ -11,6 +12,10 @@ DER = {
     "V": ((2,1,-3,-1,0,0,0),1.0),
     "Ω": ((2,1,-3,-2,0,0,0),1.0),
     "ohm":((2,1,-3,-2,0,0,0),1.0),
+    "C": ((0,0,1,1,0,0,0),1.0),
+    "W": ((2,1,-3,0,0,0,0),1.0),
+    "N": ((1,1,-2,0,0,0,0),1.0),
+    "Pa":((-1,1,-2,0,0,0,0),1.0),
     "eV":((2,1,-2,0,0,0,0),1.602176634e-19),
 }
 PREFIX={"Y":1e24,"Z":1e21,"E":1e18,"P":1e15,"T":1e12,"G":1e9,"M":1e6,"k":1e3,"h":1e2,"da":1e1,
@@ -31,6 +36,7 @@ def _atom(tok):
     if tok[0:1] in PREFIX and tok[1:] in DER: d,f=DER[tok[1:]]; return d,f*PREFIX[tok[0:1]]
     raise ValueError(f"Unknown unit token: {tok}")
 
+@lru_cache(maxsize=4096)
 def parse_unit(u:str):
     if not u or u=="1": return BASE[""]
     u=u.replace(" ","")
@@ -45,15 +51,44 @@ def parse_unit(u:str):
             d,f=_atom(base); dim=_div(dim,_pow(d,p)); fac/=f**p
     return dim, fac
 
-def convert(val, from_u, to_u):
+@lru_cache(maxsize=4096)
+def conversion_scales(from_u: str, to_u: str) -> Tuple[float, float]:
+    """(f1, f2) base-unit scales of a compatible pair; values convert as (val*f1)/f2."""
     d1,f1=parse_unit(from_u); d2,f2=parse_unit(to_u)
     if d1!=d2: raise ValueError("Incompatible units")
-    return (val*f1)/f2
+    return f1, f2
+
+def conversion_factor(from_u: str, to_u: str) -> float:
+    f1,f2=conversion_scales(from_u, to_u); return f1/f2
+
+def convert(val, from_u, to_u):
+    f1,f2=conversion_scales(from_u, to_u)
+    return (val*f1)/f2  # same rounding as val*f1/f2 in existing proofs (not val*(f1/f2))
+
+class ConversionTable:
+    """Per-spec (from_unit, spec_unit) -> (f1, f2) scale map, filled the first time a pair is seen;
+    conversions evaluate (val*f1)/f2 like `convert`."""
+    def __init__(self): self.factors: Dict[Tuple[str,str], Tuple[float,float]] = {}
+    def scales(self, from_u: str, to_u: str) -> Tuple[float, float]:
+        f=self.factors.get((from_u,to_u))
+        if f is None: f=self.factors[(from_u,to_u)]=conversion_scales(from_u, to_u)
+        return f
+    def factor(self, from_u: str, to_u: str) -> float:
+        f1,f2=self.scales(from_u, to_u); return f1/f2
+    def convert(self, val, from_u: str, to_u: str) -> float:
+        f1,f2=self.scales(from_u, to_u); return (val*f1)/f2
+    def convert_array(self, vals, from_u: Union[str, Sequence[str]], to_u: str) -> np.ndarray:
+        """Vectorized conversion of a column; `from_u` is one unit or one unit per element."""
+        vals=np.asarray(vals, dtype=float)
+        if isinstance(from_u, str): f1,f2=self.scales(from_u, to_u); return (vals*f1)/f2
+        uniq, inv = np.unique(np.asarray(from_u, dtype=str), return_inverse=True)
+        f=np.array([self.scales(str(u), to_u) for u in uniq]).reshape(-1, 2)[inv.reshape(-1)]
+        return (vals*f[:,0])/f[:,1]
 
-def coerce_inputs_to_spec_units(values: dict, spec_units: Dict[str,str]):
-    steps=[]; out=dict(values)
+def coerce_inputs_to_spec_units(values: dict, spec_units: Dict[str,str], table: Optional[ConversionTable] = None):
+    steps=[]; out=dict(values); conv=table.convert if table is not None else convert
     for k,u in spec_units.items():
         if isinstance(values.get(k), dict) and "value" in values[k] and "unit" in values[k]:
-            v=float(values[k]["value"]); from_u=str(values[k]["unit"]); v2=convert(v, from_u, u)
+            v=float(values[k]["value"]); from_u=str(values[k]["unit"]); v2=conv(v, from_u, u)
             out[k]=v2; steps.append({"op":"unit_convert","var":k,"from":from_u,"to":u,"value_in":v,"value_out":v2})
     return out, steps
@@ -0,0 +1,90 @@
+from typing import Any, Dict, List, Sequence, Union
+import numpy as np
+from . import no_net as _no_net  # noqa: F401
+from .spec import Spec
+from .compiled import CompiledSpec, compile_spec
+from .diagnose import TOLS, diagnose_and_repair
+from .batch import _columns, _pack, diagnose_and_repair_batch
+from .instrument import Probe, runtime_env
+
+# A record is "clean" when every constraint already holds within the windows the repair pipeline
+# accepts without changing a value (sum <= cap, simplex sum within simplex_sum_soft, ...), all
+# spec variables are plain numbers and no unit conversion is needed. Clean records get a minimal
+# result (no steps, repaired == original); everything else goes through the full pipeline.
+
+def _plan(cs: CompiledSpec):
+    p = cs.__dict__.get("_columns")
+    if p is None: p = cs.__dict__["_columns"] = _columns(cs)
+    return p
+
+def is_clean(cs: CompiledSpec, values: Dict[str, Any]) -> bool:
+    cols, optional = _plan(cs)
+    if any(type(values.get(c)) not in (int, float) for c in cols): return False
+    if any(values.get(c) is not None and type(values[c]) not in (int, float) for c in optional): return False
+    for k, (lo, hi) in cs.bounds.items():
+        v = values[k]
+        if not ((lo is None or v >= lo) and (hi is None or v <= hi)): return False
+    for c, ceq in cs.equalities:
+        if not abs(ceq.residual(values)) <= float(c.get("tol", TOLS["equality"])): return False
+    for c in cs.constraints:
+        t = c.get("type")
+        if t == "sum_leq":
+            if not sum(float(values[v]) for v in c["vars"]) <= float(values.get(c.get("cap_var", "cap"), c.get("cap", 0.0))): return False
+        elif t == "simplex":
+            y = [float(values[v]) for v in c["vars"]]
+            if not abs(sum(y) - 1.0) <= TOLS["simplex_sum_soft"] or any(v < TOLS["simplex_neg"] for v in y): return False
+        elif t == "monotone":
+            seq = [float(values[v]) for v in c["vars"]]
+            if any(seq[i] > seq[i + 1] + (-TOLS["monotone_slack"]) for i in range(len(seq) - 1)): return False
+    return True
+
+def clean_rows(cs: CompiledSpec, X: np.ndarray, ix: Dict[str, int], *, sum_slack: float = 0.0) -> np.ndarray:
+    """Vectorized `is_clean` over a packed batch matrix (see `batch._pack`); NaN cells fail every check.
+    `sum_slack` gives sum_leq caps relative headroom (the repair windows of `diagnose.violations`)."""
+    ok = np.ones(len(X), dtype=bool)
+    with np.errstate(all="ignore"):
+        if cs.bounds:
+            B = X[:, [ix[k] for k in cs.bounds]]
+            lo = np.array([-np.inf if l is None else l for l, _ in cs.bounds.values()], dtype=float)
+            hi = np.array([np.inf if h is None else h for _, h in cs.bounds.values()], dtype=float)
+            ok &= ((B >= lo) & (B <= hi)).all(axis=1)
+        for c, ceq in cs.equalities:
+            ok &= np.abs(ceq.residual_rows(X, ix)) <= float(c.get("tol", TOLS["equality"]))
+        for c in cs.constraints:
+            t = c.get("type")
+            if t not in ("sum_leq", "simplex", "monotone"): continue
+            Y = X[:, [ix[v] for v in c["vars"]]]; s = np.cumsum(Y, axis=1)[:, -1] if Y.shape[1] else np.zeros(len(X))
+            if t == "sum_leq":
+                cap = X[:, ix[c.get("cap_var", "cap")]].copy(); cap[np.isnan(cap)] = float(c.get("cap", 0.0))
+                ok &= s <= cap * (1.0 + sum_slack)
+            elif t == "simplex":
+                ok &= (np.abs(s - 1.0) <= TOLS["simplex_sum_soft"]) & (Y >= TOLS["simplex_neg"]).all(axis=1)
+            else:
+                ok &= ~(Y[:, :-1] > Y[:, 1:] + (-TOLS["monotone_slack"])).any(axis=1)
+    return ok
+
+def _clean_result(values: Dict[str, Any], elapsed_ms: int, env: Dict[str, str]) -> Dict[str, Any]:
+    return {"original": dict(values), "repaired": dict(values),
+            "report": {"violations": [], "steps": [], "meta": {"elapsed_ms": elapsed_ms, "validated": True, "env": env}}}
+
+def validate(spec: Union[Spec, CompiledSpec], values: Dict[str, Any], *, spec_path: str = "", inputs_path: str = "") -> Dict[str, Any]:
+    """Check-first `diagnose_and_repair`: a clean record short-circuits to a minimal result
+    (meta.validated = True); a violating one is repaired as usual."""
+    cs = compile_spec(spec); pr = Probe(cs.name)
+    ok = is_clean(cs, values); pr.lap("validate"); pr.count("validate", "clean" if ok else "dirty")
+    ns = pr.done(int(ok), "validate")
+    if not ok: return diagnose_and_repair(cs, values, spec_path=spec_path, inputs_path=inputs_path)
+    return _clean_result(values, ns // 1_000_000, runtime_env())
+
+def validate_batch(spec: Union[Spec, CompiledSpec], records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Vectorized `validate`: one pass of cheap checks over all records, then only the violating
+    ones go to `diagnose_and_repair_batch`. Results are in input order."""
+    cs = compile_spec(spec); pr = Probe(cs.name); cols, optional = _plan(cs)
+    X, scalar = _pack(records, cols, optional)
+    ok = clean_rows(cs, X, {c: j for j, c in enumerate(cols + optional)}) & ~scalar
+    nc = int(ok.sum()); pr.lap("validate"); pr.count("validate", "clean", nc); pr.count("validate", "dirty", len(records) - nc)
+    ms = pr.done(nc, "validate") // 1_000_000 // max(nc, 1)
+    bad = np.flatnonzero(~ok).tolist()
+    rep = iter(diagnose_and_repair_batch(cs, [records[i] for i in bad]) if bad else ())
+    env = runtime_env()
+    return [_clean_result(r, ms, env) if c else next(rep) for r, c in zip(records, ok.tolist())]
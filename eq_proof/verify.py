@@ -1,19 +1,82 @@
-
 import json, hashlib, hmac
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Iterable, Iterator, Tuple
+from . import merkle
 def _payload(att: dict) -> bytes:
     core = {k:v for k,v in att.items() if k not in ("signature","algo","pubkey")}
     return json.dumps(core, sort_keys=True).encode("utf-8")
-def verify_hmac(att: dict, key: str = "DEMO_KEY") -> bool:
-    msg=_payload(att); calc=hmac.new(key.encode("utf-8"), msg, hashlib.sha256).hexdigest()
-    return calc == att.get("signature")
-def verify_ed25519(att: dict, pubkey_hex: str | None = None) -> bool:
+@lru_cache(maxsize=None)
+def _nacl():
     try:
         import nacl.signing, nacl.encoding  # type: ignore
+        return nacl
     except Exception:
-        return False
-    msg=_payload(att); pk = pubkey_hex or att.get("pubkey"); 
-    if not pk: return False
+        return None
+@lru_cache(maxsize=256)
+def _verify_key(pk_hex: str):
+    nacl = _nacl()
+    return nacl.signing.VerifyKey(pk_hex, encoder=nacl.encoding.HexEncoder)  # type: ignore
+def _hmac_ok(att: dict, msg: bytes, key: bytes) -> bool:
+    return hmac.new(key, msg, hashlib.sha256).hexdigest() == att.get("signature")
+def _ed25519_ok(att: dict, msg: bytes, pubkey_hex) -> bool:
+    pk = pubkey_hex or att.get("pubkey")
+    if not pk or _nacl() is None: return False
     try:
-        vk = nacl.signing.VerifyKey(pk, encoder=nacl.encoding.HexEncoder)  # type: ignore
-        vk.verify(msg, bytes.fromhex(att.get("signature",""))); return True
+        _verify_key(pk).verify(msg, bytes.fromhex(att.get("signature",""))); return True
+    except Exception: return False
+def verify_hmac(att: dict, key: str = "DEMO_KEY") -> bool:
+    return _hmac_ok(att, _payload(att), key.encode("utf-8"))
+def verify_ed25519(att: dict, pubkey_hex: str | None = None) -> bool:
+    if _nacl() is None: return False
+    return _ed25519_ok(att, _payload(att), pubkey_hex)
+def verify_inclusion(rec: dict, header: dict) -> bool:
+    """Check that a batch record (see `attest.attest_batch`) is a leaf under the header's Merkle
+    root for the same spec. The header's own signature is checked with verify_hmac/verify_ed25519."""
+    b = rec.get("batch") or {}
+    if b.get("root") != header.get("merkle_root") or b.get("size") != header.get("size"): return False
+    if rec.get("meta",{}).get("spec_hash") != header.get("meta",{}).get("spec_hash"): return False
+    leaf = merkle.leaf_hash({k:v for k,v in rec.items() if k != "batch"})
+    try: return merkle.root_from_path(leaf, int(b["index"]), int(b["size"]), b.get("path",[])).hex() == header["merkle_root"]
     except Exception: return False
+
+class Verifier:
+    """Signature checks with the HMAC key encoded once, Ed25519 VerifyKeys cached per public key,
+    one canonical payload per attestation and batch headers verified once per Merkle root."""
+    def __init__(self, algo: str = "auto", pubkey: str | None = None, hmac_key: str = "DEMO_KEY", headers: Iterable[dict] = ()):
+        self.algo = algo; self.pubkey = pubkey; self.key = hmac_key.encode("utf-8")
+        self.headers = {h.get("merkle_root"): h for h in headers}; self._roots: dict = {}
+    def signed(self, att: dict) -> bool:
+        msg = _payload(att)
+        if self.algo in ("auto","ed25519") and _ed25519_ok(att, msg, self.pubkey): return True
+        return self.algo in ("auto","hmac") and _hmac_ok(att, msg, self.key)
+    def __call__(self, att: dict) -> bool:
+        if "batch" not in att or not self.headers: return self.signed(att)
+        h = self.headers.get(att["batch"].get("root"))
+        if h is None or not verify_inclusion(att, h): return False
+        if h["merkle_root"] not in self._roots: self._roots[h["merkle_root"]] = self.signed(h)
+        return self._roots[h["merkle_root"]]
+    def check_raw(self, items):
+        """[(label, JSON text or decoded proof)] -> [(label, ok)]; unparsable or malformed proofs fail."""
+        out = []
+        for label, raw in items:
+            try:
+                att = raw if isinstance(raw, dict) else json.loads(raw)
+                out.append((label, isinstance(att, dict) and self(att)))
+            except (ValueError, KeyError, TypeError, AttributeError): out.append((label, False))
+        return out
+
+def verify_bulk(items: Iterable[Tuple[str, str]], verifier: Verifier, *, workers: int = 4, processes: bool = False,
+                chunk_size: int = 256) -> Iterator[Tuple[str, bool]]:
+    """Verify (label, JSON text or decoded proof) items on a thread (or process) pool, yielding (label, ok) in input
+    order with at most 2*workers chunks in flight."""
+    it = iter(items)
+    with (ProcessPoolExecutor if processes else ThreadPoolExecutor)(workers) as ex:
+        pending: deque = deque()
+        while True:
+            chunk = list(islice(it, chunk_size))
+            if chunk: pending.append(ex.submit(verifier.check_raw, chunk))
+            if pending and (not chunk or len(pending) >= 2 * workers): yield from pending.popleft().result()
+            if not chunk and not pending: return
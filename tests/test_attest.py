@@ -0,0 +1,37 @@
+import copy
+from eq_proof.attest import attest_batch
+from eq_proof.verify import verify_hmac, verify_inclusion
+
+def test_batch_attestation_inclusion_paths():
+    for n in (1, 2, 5, 8):
+        header, recs = attest_batch({"name": "s"}, [{"original": {"x": i}, "repaired": {"x": i}} for i in range(n)])
+        assert verify_hmac(header) and "spec" not in recs[0] and all(verify_inclusion(r, header) for r in recs)
+        bad = copy.deepcopy(recs[-1]); bad["proof"]["repaired"]["x"] = -1
+        assert not verify_inclusion(bad, header)
+
+def test_bulk_verifier_reports_failures_in_order():
+    import json
+    from eq_proof.attest import attest
+    from eq_proof.verify import Verifier, verify_bulk
+    good = json.dumps(attest({"name": "s"}, {"original": {"x": 1}}))
+    items = [("a", good), ("b", good.replace('"x": 1', '"x": 2')), ("c", "not json"), ("d", good)]
+    assert list(verify_bulk(items, Verifier(), workers=2, chunk_size=1)) == [("a", True), ("b", False), ("c", False), ("d", True)]
+
+def test_bulk_cli_counts_malformed_lines_and_skips_batch_headers(tmp_path):
+    import json, os, subprocess, sys
+    from eq_proof.attest import attest
+    good = json.dumps(attest({"name": "s"}, {"original": {"x": 1}}))
+    (tmp_path / "p.jsonl").write_text("\n".join([good, "null", "[1]", '{"batch": 3}', good]) + "\n")
+    (tmp_path / "p.batches.jsonl").write_text(good + "\n")
+    r = subprocess.run([sys.executable, "verify_cli.py", "--bulk", str(tmp_path), "--jobs", "2"], capture_output=True, text=True, env=dict(os.environ, PYTHONPATH="."))
+    s = json.loads(r.stdout.splitlines()[-2])
+    assert r.returncode == 2 and (s["total"], s["passed"], s["failed"]) == (5, 2, 3)
+
+def test_bulk_cli_skips_repaired_records_and_reports_empty_globs(tmp_path):
+    import json, os, subprocess, sys
+    from eq_proof.attest import attest
+    (tmp_path / "proofs.jsonl").write_text(json.dumps(attest({"name": "s"}, {"original": {"x": 1}})) + "\n")
+    (tmp_path / "repaired.jsonl").write_text('{"x": 1.0}\n')
+    run = lambda src: subprocess.run([sys.executable, "verify_cli.py", "--bulk", src], capture_output=True, text=True, env=dict(os.environ, PYTHONPATH="."))
+    r = run(str(tmp_path)); assert r.returncode == 0 and json.loads(r.stdout.splitlines()[-2])["total"] == 1
+    r = run(str(tmp_path / "none*.jsonl")); assert r.returncode == 1 and r.stderr.strip().endswith("no proof files") and "Traceback" not in r.stderr
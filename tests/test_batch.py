@@ -0,0 +1,31 @@
+import json
+from eq_proof import load_spec, diagnose_and_repair
+from eq_proof.batch import diagnose_and_repair_batch
+
+def _strip(r):
+    r = json.loads(json.dumps(r)); r["report"].pop("meta"); return r
+
+def test_batch_matches_scalar_path():
+    spec = load_spec("examples/spec_portfolio_caps.json")
+    base = json.load(open("examples/inputs_portfolio_caps.json"))
+    recs = [dict(base), {**base, "wA": -0.2}, {k: 0.2 for k in spec.variables}, {"wA": 1.0}]
+    assert [_strip(r) for r in diagnose_and_repair_batch(spec, recs)] == [_strip(diagnose_and_repair(spec, r)) for r in recs]
+
+def test_batch_never_coerces_non_numeric_values():
+    spec = load_spec("examples/spec_budget_cap.json"); ok = {"x1": 60, "x2": 50.0, "x3": 40, "cap": 120}
+    def outcome(f):
+        try: return _strip(f())
+        except TypeError as e: return str(e)
+    for bad in (None, "60", True):
+        recs = [ok, {**ok, "x1": bad}, {**ok, "cap": bad}]
+        assert outcome(lambda: diagnose_and_repair_batch(spec, recs)[1]) == outcome(lambda: diagnose_and_repair(spec, recs[1]))
+        assert [outcome(lambda r=r: diagnose_and_repair_batch(spec, [r])[0]) for r in recs] == [outcome(lambda r=r: diagnose_and_repair(spec, r)) for r in recs]
+
+def test_batch_matches_scalar_with_coupled_equalities():
+    from eq_proof.spec import Spec
+    v = [f"x{i}" for i in range(12)]
+    cons = [{"type": "equality", "expr": f"Eq({v[i]} + {v[i + 1]}, 1)", "symbols": [v[i], v[i + 1]]} for i in range(11)]
+    spec = Spec("chain", "0", v, cons + [{"type": "bounds", "var": x, "lower": 0.0, "upper": 1.0} for x in v], [], [])
+    recs = [{x: (i * 0.37 + j * 0.11) % 1.3 - 0.1 for j, x in enumerate(v)} for i in range(40)]
+    full = [_strip(r) for r in diagnose_and_repair_batch(spec, recs)]
+    assert full == [_strip(diagnose_and_repair(spec, r)) for r in recs] == [_strip(diagnose_and_repair_batch(spec, recs[i - i % 7:i - i % 7 + 7])[i % 7]) for i in range(40)]
@@ -0,0 +1,8 @@
+import json, subprocess, sys
+
+def test_benchmark_smoke_run_and_compare(tmp_path):
+    base = tmp_path / "base.json"; cmd = [sys.executable, "-m", "benchmarks.run", "--scale", "smoke", "--repeat", "1", "--kinds", "bounds,chain"]
+    subprocess.run(cmd + ["--out", str(base)], check=True, capture_output=True)
+    assert {r["kind"] for r in json.loads(base.read_text())["results"]} >= {"bounds", "chain"}
+    r = subprocess.run(cmd + ["--compare", str(base), "--threshold", "1e9"], capture_output=True, text=True)
+    assert r.returncode == 0 and json.loads(r.stdout)["scale"] == "smoke" and " ok " not in r.stdout and "ok" in r.stderr
@@ -0,0 +1,24 @@
+import json
+from eq_proof import load_spec, compile_spec
+from eq_proof.attest import reload_keys
+from eq_proof.cache import ResultCache
+from eq_proof.spec import spec_dict
+from eq_proof.stream import process_chunk
+from eq_proof.verify import verify_hmac
+
+def test_cached_chunk_reuses_results_and_proofs(tmp_path, monkeypatch):
+    cs = compile_spec(load_spec("examples/spec_probability_simplex3.json")); sd = spec_dict(cs)
+    recs = [{"p1": 0.1 * i, "p2": 0.5, "p3": -0.1} for i in range(6)]
+    with ResultCache(str(tmp_path / "c.db")) as cache:
+        _, first = process_chunk(cs, sd, recs, cache=cache)
+        _, again = process_chunk(cs, sd, recs, cache=cache)
+        assert json.loads(json.dumps(again)) == json.loads(json.dumps(first)) and all(verify_hmac(a) for _, a in again)
+        monkeypatch.setenv("EQPROOF_KEY", "rotated"); reload_keys()
+        try:
+            _, resigned = process_chunk(cs, sd, recs, cache=cache)
+            assert [r for r, _ in resigned] == [r for r, _ in again] and all(verify_hmac(a, "rotated") for _, a in resigned)
+        finally:
+            monkeypatch.delenv("EQPROOF_KEY"); reload_keys()
+    with ResultCache(str(tmp_path / "small.db"), max_bytes=4000) as cache:
+        process_chunk(cs, sd, recs, cache=cache)
+        assert 0 < cache.stats()["bytes"] <= 4000 and cache.stats()["entries"] < len(recs)
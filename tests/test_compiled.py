@@ -0,0 +1,30 @@
+from eq_proof.spec import Spec
+from eq_proof.compiled import compile_spec
+from eq_proof.constraints import equality_residual, equality_solve_for
+
+def test_compiled_equality_matches_functional_api():
+    spec = Spec("t", "1", ["x", "y", "z"], [{"type": "equality", "expr": "Eq(z, x+2*y)", "solve_for": "z"}], [], [])
+    cs = compile_spec(spec); (_, ceq), = cs.equalities
+    vals = {"x": 1.0, "y": 2.0, "z": 0.0}
+    assert compile_spec(spec) is cs and cs.name == "t"
+    assert ceq.residual(vals) == equality_residual("Eq(z, x+2*y)", vals) == -5.0
+    assert ceq.solve(vals) == equality_solve_for("Eq(z, x+2*y)", "z", vals) == 5.0
+    assert ceq.grad(vals) == [-1.0, -2.0, 1.0] and ceq.const == 0.0
+
+def test_joint_projection_resolves_coupled_equalities():
+    from eq_proof import diagnose_and_repair
+    spec = Spec("c", "1", ["a", "b", "c"], [{"type": "bounds", "var": "a", "lower": 0, "upper": 1},
+                {"type": "equality", "expr": "Eq(a+b, 4)"}, {"type": "equality", "expr": "Eq(b+c, 3)"}], [], [])
+    r = diagnose_and_repair(spec, {"a": 3.0, "b": 5.0, "c": 2.0})
+    step, = [s for s in r["report"]["steps"] if s["op"] == "joint_projection"]
+    assert step["converged"] and not r["report"]["violations"] and compile_spec(spec).joint.system is not None
+    assert abs(r["repaired"]["a"] - 1.0) < 1e-9 and abs(r["repaired"]["a"] + r["repaired"]["b"] - 4.0) < 1e-9
+
+def test_trust_region_resolves_nonlinear_equalities_within_bounds():
+    from eq_proof import diagnose_and_repair
+    spec = Spec("n", "1", ["x", "y", "P", "V", "I"], [{"type": "bounds", "var": "x", "lower": 0.2, "upper": 1},
+                {"type": "equality", "expr": "Eq(x**2+y**2, 1)"}, {"type": "equality", "expr": "Eq(P, V*I)"}, {"type": "equality", "expr": "Eq(P+x, 7)"}], [], [])
+    r = diagnose_and_repair(spec, {"x": 4.0, "y": 6.0, "P": 8.0, "V": 0.5, "I": 7.0})
+    step, = [s for s in r["report"]["steps"] if s["op"] == "trust_region"]
+    assert step["converged"] and not r["report"]["violations"] and 0.2 <= r["repaired"]["x"] <= 1
+    assert step["residual_history"][-1] < 1e-9 < step["residual_history"][0] and len(step["residual_history"]) <= step["iterations"] + 1
@@ -0,0 +1,11 @@
+import subprocess, sys
+
+def test_verify_and_attest_import_without_heavy_dependencies():
+    code = ("import sys, eq_proof, eq_proof.verify, eq_proof.attest, verify_cli; "
+            "from eq_proof import load_spec; load_spec('examples/spec_probability_simplex3.json'); "
+            "print(','.join(m for m in ('sympy', 'numpy', 'matplotlib') if m in sys.modules))")
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == ""
+
+def test_attest_export_is_the_function_after_submodule_imports():
+    code = "import eq_proof.stream, eq_proof.attest; from eq_proof import attest; import eq_proof; print(callable(attest), type(eq_proof.attest).__name__)"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split() == ["True", "function"]
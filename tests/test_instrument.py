@@ -0,0 +1,19 @@
+import json
+from eq_proof import load_spec, diagnose_and_repair
+from eq_proof.batch import diagnose_and_repair_batch
+from eq_proof.instrument import STATS, add_hook, remove_hook
+
+def test_counters_match_between_scalar_and_batch():
+    spec = load_spec("examples/spec_portfolio_caps.json")
+    base = json.load(open("examples/inputs_portfolio_caps.json"))
+    recs = [dict(base), {**base, "wA": -0.2}, {k: 0.2 for k in spec.variables}]
+    seen = []; hook = add_hook(lambda kind, p: seen.append((kind, p["records"])))
+    try:
+        STATS.reset(); res = [diagnose_and_repair(spec, r) for r in recs]; scalar = STATS.to_dict()["specs"][spec.name]
+        STATS.reset(); diagnose_and_repair_batch(spec, recs); batch = STATS.to_dict()["specs"][spec.name]
+    finally: remove_hook(hook)
+    assert seen == [("record", 1)] * 3 + [("batch", 3)]
+    assert scalar["constraints"] == batch["constraints"] and scalar["records"] == batch["records"] == 3
+    assert "units" in res[0]["report"]["meta"]["stages_ns"]
+    n = scalar["constraints"]["simplex[7]"]["checked"]  # once per record, plus once per fixed-point round
+    assert n > 3 and 'eqproof_constraint_events_total{spec="%s",constraint="simplex[7]",event="checked"} %d' % (spec.name, n) in STATS.to_prometheus()
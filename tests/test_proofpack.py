@@ -0,0 +1,36 @@
+import json, os
+from eq_proof import load_spec
+from eq_proof.proofpack import ProofReader, ProofWriter, decode, encode
+from eq_proof.stream import repair_chunks
+from eq_proof.verify import Verifier
+
+RECS = [{"p1": 0.1 * i, "p2": 0.3, "p3": 0.5} for i in range(7)]
+
+def _pairs(batch_attest=False):
+    return list(repair_chunks(load_spec("examples/spec_probability_simplex3.json"), RECS, chunk_size=3, batch_attest=batch_attest))
+
+def test_encode_roundtrip():
+    v = {"b": [1.5, -0.0, float("inf")], "a": [1, "x", None, True, False, {}], "big": 1 << 70, "s": "é" * 60, "e": []}
+    assert decode(encode(v)) == v and encode(v) == encode(dict(reversed(list(v.items()))))
+
+def test_pack_roundtrip_random_access_and_spec_once(tmp_path):
+    path = str(tmp_path / "p.eqpb"); atts = [att for _, pairs in _pairs() for _, att in pairs]
+    with ProofWriter(path) as w:
+        for att in atts: w.add(att)
+    with ProofReader(path) as r:
+        assert len(r) == len(atts) and len(r.offsets[ord("S")]) == 1
+        assert json.dumps(r[5], sort_keys=True) == json.dumps(atts[5], sort_keys=True)
+        assert all(Verifier()(att) for att in r)
+    assert os.path.getsize(path) < sum(len(json.dumps(a)) for a in atts) / 2
+
+def test_pack_batch_headers_and_truncated_file(tmp_path):
+    path = str(tmp_path / "b.eqpb"); chunks = _pairs(batch_attest=True)
+    with ProofWriter(path) as w:
+        for header, pairs in chunks:
+            w.add_header(header)
+            for _, att in pairs: w.add(att)
+    with ProofReader(path) as r:
+        v = Verifier(headers=r.headers()); assert len(r.headers()) == 3 and all(v(att) for att in r)
+        bad = r[0]; bad["proof"]["repaired"]["p1"] = 0.9; assert not v(bad)
+    with open(path, "r+b") as f: f.truncate(os.path.getsize(path) - 4)  # no trailer: entries are rescanned
+    with ProofReader(path) as r: assert len(r) == len(RECS) and len(r.headers()) == 3
@@ -0,0 +1,27 @@
+import numpy as np
+from eq_proof.repair import isotonic_increasing, pav, pav_rows, project_simplex, project_simplex_rows, project_capped_simplex_rows
+
+def _pool_ref(y, w):  # pool the first adjacent violating pair until none is left
+    b = [[yi * wi, wi, 1] for yi, wi in zip(y, w)]
+    while True:
+        k = next((i for i in range(len(b) - 1) if b[i][0] / b[i][1] > b[i + 1][0] / b[i + 1][1]), None)
+        if k is None: return np.repeat([s / t for s, t, _ in b], [n for _, _, n in b])
+        b[k] = [b[k][j] + b[k + 1][j] for j in range(3)]; del b[k + 1]
+
+def test_pav_matches_pooling_reference():
+    rng = np.random.default_rng(0); y = rng.normal(size=200); w = rng.uniform(0.1, 3.0, 200)
+    assert np.allclose(pav(y, w), _pool_ref(y, w)) and np.allclose(pav(y), _pool_ref(y, np.ones(200)))
+    assert isotonic_increasing([3.0, 1.0, 2.0, 0.0]) == [1.5] * 4
+    assert np.allclose(pav(y, decreasing=True), -pav(-y)) and np.all(np.diff(pav(y, decreasing=True)) <= 0)
+    assert pav([3.0, 2.0, 1.0], lower=2.5).tolist() == [2.5] * 3 and pav_rows(np.vstack([y, y[::-1]]))[1].tolist() == pav(y[::-1]).tolist()
+
+def test_simplex_projections():
+    rng = np.random.default_rng(1); Y = rng.normal(size=(20, 12)); W = rng.uniform(0.5, 2.0, Y.shape)
+    P = project_simplex_rows(Y); assert np.allclose(P.sum(axis=1), 1.0) and (P >= 0).all()
+    assert np.allclose(project_simplex_rows(Y, W=np.ones_like(Y)), P) and project_simplex(Y[0].tolist()) == P[0].tolist()
+    Q = project_simplex_rows(Y, 2.0, W); assert np.allclose(Q.sum(axis=1), 2.0)
+    # KKT for min sum w (x - y)^2: w (y - x) is the same on the support and <= it off the support
+    g = W * (Y - Q)
+    for gi, qi in zip(g, Q): assert np.ptp(gi[qi > 0]) < 1e-9 and (gi[qi == 0] <= gi[qi > 0].min() + 1e-9).all()
+    C = project_capped_simplex_rows(Y, 0.2); assert np.allclose(C.sum(axis=1), 1.0) and C.max() <= 0.2 and C.min() >= 0
+    assert np.allclose(project_capped_simplex_rows(Y, 5.0), P)
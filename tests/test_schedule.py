@@ -0,0 +1,24 @@
+import json
+from eq_proof import load_spec, compile_spec, diagnose_and_repair
+from eq_proof.batch import diagnose_and_repair_batch
+from eq_proof.diagnose import violations
+from eq_proof.spec import Spec
+
+def _strip(r):
+    r = json.loads(json.dumps(r)); r["report"].pop("meta"); return r
+
+def test_components_split_on_shared_variables():
+    cs = compile_spec(Spec("c", "1", ["a", "b", "c", "d"], [
+        {"type": "bounds", "var": "a", "lower": 0}, {"type": "sum_leq", "vars": ["a", "b"], "cap_var": "k", "cap": 1.0},
+        {"type": "monotone", "vars": ["c", "d"]}, {"type": "bounds", "var": "b", "upper": 2}], [], []))
+    assert [[cs.label(c) for c in k.constraints] for k in cs.components] == [["bounds[0]", "sum_leq[1]", "bounds[3]"], ["monotone[2]"]]
+
+def test_caps_hold_after_simplex_pass():
+    spec = load_spec("examples/spec_portfolio_caps.json")
+    recs = [{"wA": 0.5, "wB": 0.4, "wC": 0.3, "wD": 0.1, "wE": 0.1, "capTech": 0.5, "capEnergy": 0.6},
+            json.load(open("examples/inputs_portfolio_caps.json"))]  # caps 0.6 + 0.25 < 1: infeasible
+    ok, bad = [diagnose_and_repair(spec, r) for r in recs]
+    assert ok["report"]["violations"] == [] and violations(compile_spec(spec), ok["repaired"]) == []
+    assert any(s.get("round") == 1 for s in ok["report"]["steps"])
+    assert {v["type"] for v in bad["report"]["violations"]} == {"sum_leq"}
+    assert [_strip(r) for r in diagnose_and_repair_batch(spec, recs)] == [_strip(ok), _strip(bad)]
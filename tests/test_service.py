@@ -0,0 +1,33 @@
+import json, os, tempfile, threading
+from eq_proof.service import RepairService, make_server, call
+from eq_proof.verify import verify_hmac, verify_ed25519, verify_inclusion
+
+def _ok(att): return verify_ed25519(att) or verify_hmac(att)
+
+def test_service_over_unix_socket():
+    spec = json.load(open("examples/spec_probability_simplex3.json"))
+    sock = os.path.join(tempfile.mkdtemp(), "eqp.sock")
+    srv = make_server(RepairService(max_specs=2), socket_path=sock)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        code, out = call(sock, "/specs", {"spec": spec}); h = out["spec_hash"]
+        code, att = call(sock, "/repair", {"spec_hash": h, "values": {"p1": 0.7, "p2": -0.1, "p3": 0.6}})
+        assert code == 200 and _ok(att) and att["meta"]["spec_hash"] == h
+        assert abs(sum(att["proof"]["repaired"].values()) - 1.0) < 1e-9
+        code, out = call(sock, "/repair_batch", {"spec_hash": h, "records": [{"p1": 0.2, "p2": 0.3, "p3": 0.5}] * 3, "batch_attest": True, "validate": True})
+        assert code == 200 and _ok(out["header"]) and all(verify_inclusion(r, out["header"]) for r in out["proofs"])
+        assert call(sock, "/repair", {"spec_hash": "nope", "values": {}})[0] == 404
+        assert call(sock, "/repair", {"spec_hash": h})[0] == 400
+        assert call(sock, "/health") == (200, {"ok": True, "specs": 1})
+    finally:
+        srv.shutdown(); srv.server_close()
+
+def test_service_socket_is_owner_only_and_never_replaces_files():
+    import pytest, stat
+    d = tempfile.mkdtemp(); sock, other = os.path.join(d, "eqp.sock"), os.path.join(d, "notes.txt")
+    srv = make_server(RepairService(), socket_path=sock); srv.server_close()
+    assert stat.S_IMODE(os.stat(sock).st_mode) == 0o600
+    make_server(RepairService(), socket_path=sock).server_close()  # a stale socket is replaced
+    open(other, "w").write("keep")
+    with pytest.raises(FileExistsError): make_server(RepairService(), socket_path=other)
+    assert open(other).read() == "keep"
@@ -0,0 +1,38 @@
+from eq_proof import load_spec
+import pytest
+from eq_proof.stream import read_records, record_columns, repair_stream, spec_columns, RecordWriter
+from eq_proof.verify import verify_hmac
+
+def test_stream_csv_roundtrip(tmp_path):
+    src = tmp_path / "in.csv"; src.write_text("x1,x2,x3,cap\n60,50,40,120\n1,2,3,120\n")
+    out = list(repair_stream(load_spec("examples/spec_budget_cap.json"), read_records(str(src)), chunk_size=1))
+    assert [r["repaired"]["x1"] for r, _ in out] == [48.0, 1.0] and all(verify_hmac(a) for _, a in out)
+    with RecordWriter(str(tmp_path / "rep.csv")) as w:
+        for r, _ in out: w.write(r["repaired"])
+    assert list(read_records(str(tmp_path / "rep.csv"))) == [r["repaired"] for r, _ in out]
+
+def test_csv_columns_come_from_the_input(tmp_path):
+    src = tmp_path / "in.csv"; src.write_text("x1,x2,x3,id\n60,50,40,\n1,2,3,r2\n")
+    spec = load_spec("examples/spec_budget_cap.json"); cols = record_columns(str(src), spec)
+    assert cols == ["x1", "x2", "x3", "id", "cap"]
+    with RecordWriter(str(tmp_path / "rep.csv"), columns=cols) as w:
+        for r, _ in repair_stream(spec, read_records(str(src)), sign=False): w.write(r["repaired"])
+    assert [r.get("id") for r in read_records(str(tmp_path / "rep.csv"))] == [None, "r2"]
+    with RecordWriter(str(tmp_path / "bad.csv")) as w, pytest.raises(ValueError, match="id"):
+        w.write({"x1": 1.0}); w.write({"x1": 2.0, "id": "r2"})
+
+def test_csv_passthrough_columns_stay_text(tmp_path):
+    src, out = tmp_path / "in.csv", tmp_path / "rep.csv"; src.write_text("id,x1,x2,x3,cap,note\n000,60,50,40,120,nan\n")
+    spec = load_spec("examples/spec_budget_cap.json")
+    recs = list(read_records(str(src), numeric=spec_columns(spec)))
+    assert recs == [{"id": "000", "x1": 60.0, "x2": 50.0, "x3": 40.0, "cap": 120.0, "note": "nan"}]
+    with RecordWriter(str(out), columns=record_columns(str(src), spec)) as w:
+        for r, _ in repair_stream(spec, recs, sign=False): w.write(r["repaired"])
+    assert out.read_text().splitlines() == ["id,x1,x2,x3,cap,note", "000,48.0,40.0,32.0,120.0,nan"]
+
+def test_parallel_preserves_order():
+    recs = [{"x1": float(i), "x2": 50.0, "x3": 40.0, "cap": 120.0} for i in range(50)]
+    spec = load_spec("examples/spec_budget_cap.json")
+    par = list(repair_stream(spec, recs, chunk_size=7, workers=2))
+    assert [r["repaired"] for r, _ in par] == [r["repaired"] for r, _ in repair_stream(spec, recs, sign=False)]
+    assert all(verify_hmac(a) for _, a in par)
@@ -0,0 +1,49 @@
+import json, os, subprocess, sys
+import pytest
+from eq_proof import load_spec
+from eq_proof.stream import read_records, record_writer, spec_columns, RecordWriter
+
+RECS = [{"x1": 60.0, "x2": 50.0, "x3": 40.0, "cap": 120.0}, {"x1": 1.0, "x2": 2.5, "x3": 3.0, "cap": 120.0}]
+
+@pytest.mark.parametrize("ext, dep", [(".parquet", "pyarrow"), (".arrow", "pyarrow"), (".xlsx", "openpyxl")])
+def test_table_roundtrip(tmp_path, ext, dep):
+    pytest.importorskip(dep)
+    path = str(tmp_path / ("t" + ext))
+    with RecordWriter(path) as w:
+        for r in RECS: w.write(r)
+    assert list(read_records(path)) == RECS
+
+ROWS = [["x1", "x2", "id"], [60, 50, None], [None, None, None], [1, "2", "000"], [None, None, None]]
+
+def _write_input(path, ext):
+    cols = {h: [r[j] for r in ROWS[1:-1]] for j, h in enumerate(ROWS[0])}
+    if ext == ".xlsx":
+        openpyxl = pytest.importorskip("openpyxl"); wb = openpyxl.Workbook()
+        for r in ROWS: wb.active.append(r)
+        wb.save(path); return
+    pa = pytest.importorskip("pyarrow"); import pyarrow.ipc, pyarrow.parquet  # noqa: F401
+    t = pa.table({"x1": pa.array(cols["x1"], pa.int64()), "x2": pa.array([None if v is None else str(v) for v in cols["x2"]], pa.string()), "id": cols["id"]})
+    if ext == ".parquet": pa.parquet.write_table(t, path)
+    else:
+        with pa.ipc.new_file(path, t.schema) as w: w.write_table(t)
+
+@pytest.mark.parametrize("ext", [".parquet", ".arrow", ".xlsx"])
+def test_tables_read_and_write_like_csv(tmp_path, ext):
+    src, csv_src = str(tmp_path / ("in" + ext)), tmp_path / "in.csv"; _write_input(src, ext)
+    csv_src.write_text("x1,x2,id\n60,50,\n,,\n1,2,000\n")
+    spec, out = load_spec("examples/spec_budget_cap.json"), str(tmp_path / ("out" + ext)); num = spec_columns(spec)
+    recs = list(read_records(src, numeric=num))  # spec columns parsed, the id text column is not
+    assert recs == list(read_records(str(csv_src), numeric=num)) == [{"x1": 60, "x2": 50.0}, {}, {"x1": 1, "x2": 2.0, "id": "000"}]
+    with record_writer(out, src, spec) as w:  # first row has no id; spec variables x3/cap are added
+        w.f.chunk_size = 1
+        for r in recs: w.write(r)
+    assert list(read_records(out, numeric=num)) == recs and list(read_records(out))[2]["id"] == "000"
+    with pytest.raises(ValueError, match="extra"), record_writer(str(tmp_path / ("bad" + ext)), src, spec) as w: w.write({"x1": 1.0, "extra": 2})
+
+def test_bridge_wide_csv(tmp_path):
+    src = tmp_path / "sheet.csv"; src.write_text("x1,x2,x3,cap\n60,50,40,120\n1,2,3,120\n")
+    out, proofs = tmp_path / "rep.csv", tmp_path / "p.jsonl"
+    subprocess.run([sys.executable, "bridges/spreadsheet_bridge.py", "examples/spec_budget_cap.json", str(src), "--out-sheet", str(out),
+                    "--out-proof", str(proofs), "--chunk-size", "1"], check=True, capture_output=True, env=dict(os.environ, PYTHONPATH="."))
+    assert [r["x1"] for r in read_records(str(out))] == [48.0, 1.0]
+    assert [json.loads(l)["proof"]["repaired"]["x1"] for l in proofs.read_text().splitlines()] == [48.0, 1.0]
@@ -0,0 +1,14 @@
+import pytest
+from eq_proof.units import convert, ConversionTable
+
+def test_derived_units_and_table():
+    assert convert(2.0, "kN", "kg*m/s^2") == 2000.0 and convert(1.0, "kPa", "N/m^2") == 1000.0
+    assert convert(3.0, "mC", "A*s") == 0.003 and convert(5.0, "W", "J/s") == 5.0
+    t = ConversionTable()
+    assert t.convert_array([1.0, 2.0], ["kW", "W"], "W").tolist() == [1000.0, 2.0] and set(t.factors) == {("kW", "W"), ("W", "W")}
+    with pytest.raises(ValueError): t.factor("Pa", "W")
+
+def test_conversion_rounding_matches_val_times_f1_over_f2():
+    from eq_proof.units import conversion_scales
+    f1, f2 = conversion_scales("eV", "kJ"); t = ConversionTable()
+    assert convert(0.1, "eV", "kJ") == t.convert(0.1, "eV", "kJ") == t.convert_array([0.1], ["eV"], "kJ")[0] == (0.1 * f1) / f2 != 0.1 * (f1 / f2)
@@ -0,0 +1,14 @@
+import json
+from eq_proof import load_spec, diagnose_and_repair, validate, validate_batch
+
+def _strip(r):
+    r = json.loads(json.dumps(r)); r["report"].pop("meta"); return r
+
+def test_clean_records_short_circuit_and_dirty_ones_are_repaired():
+    spec = load_spec("examples/spec_probability_simplex3.json")
+    clean, dirty = {"p1": 0.2, "p2": 0.3, "p3": 0.5}, {"p1": 0.7, "p2": -0.1, "p3": 0.6}
+    res = validate(spec, clean)
+    assert res["report"]["steps"] == [] and res["report"]["meta"]["validated"] and res["repaired"] == clean
+    assert diagnose_and_repair(spec, clean)["repaired"] == clean
+    assert _strip(validate(spec, dirty)) == _strip(diagnose_and_repair(spec, dirty))
+    assert [_strip(r) for r in validate_batch(spec, [clean, dirty, clean])] == [_strip(validate(spec, r)) for r in (clean, dirty, clean)]
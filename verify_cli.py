@@ -1,14 +1,69 @@
-
 #!/usr/bin/env python3
-import argparse, json, sys
-from eq_proof.verify import verify_hmac, verify_ed25519
+import argparse, glob, json, os, sys, time
+from eq_proof.verify import Verifier, verify_bulk
+def _load(path, line=None):
+    if path.endswith(".eqpb"):
+        from eq_proof.proofpack import ProofReader
+        with ProofReader(path) as r:
+            if not 0<=(line or 0)<len(r): raise SystemExit(f"{path}: no record {line or 0}")
+            return r[line or 0]
+    if line is None: return json.load(open(path))
+    with open(path) as f:
+        for i,l in enumerate(f):
+            if i==line: return json.loads(l)
+    raise SystemExit(f"{path}: no line {line}")
+def _load_headers(path):
+    with open(path) as f: txt=f.read()
+    try: return [json.loads(txt)]
+    except ValueError: return [json.loads(l) for l in txt.splitlines() if l.strip()]
+def _pack_headers(path):
+    from eq_proof.proofpack import ProofReader
+    with ProofReader(path) as r: return r.headers()
+def _bulk_paths(src):
+    """Proof files of a directory (*.json, *.jsonl, *.eqpb; not the *.batches.jsonl headers nor the repaired.* records
+    cli.py and the spreadsheet bridge write next to them), a glob, or one file."""
+    if os.path.isdir(src):
+        paths=[p for ext in ("*.json","*.jsonl","*.eqpb") for p in glob.glob(os.path.join(src,ext))
+               if not (p.endswith(".batches.jsonl") or os.path.basename(p).startswith("repaired."))]
+    else: paths=[p for p in glob.glob(src) if os.path.isfile(p)]
+    if not paths: raise SystemExit(f"{src}: no proof files")
+    return sorted(paths)
+def _iter_bulk(src):
+    """(label, JSON text or decoded proof) for a directory of *.json/*.jsonl/*.eqpb, a glob, or one such file."""
+    for path in _bulk_paths(src):
+        if path.endswith(".eqpb"):
+            from eq_proof.proofpack import ProofReader
+            with ProofReader(path) as r:
+                for i,att in enumerate(r): yield f"{path}:{i}", att
+        elif path.endswith(".jsonl"):
+            with open(path) as f:
+                for i,l in enumerate(f):
+                    if l.strip(): yield f"{path}:{i}", l
+        else:
+            with open(path) as f: yield path, f.read()
+def _run_bulk(args, verifier):
+    n=bad=0; t0=time.perf_counter()
+    for label,ok in verify_bulk(_iter_bulk(args.bulk), verifier, workers=args.jobs, processes=args.processes):
+        n+=1
+        if not ok: bad+=1; print(f"FAILED {label}", flush=True)
+    dt=time.perf_counter()-t0
+    print(json.dumps({"total":n,"passed":n-bad,"failed":bad,"seconds":round(dt,3),"per_sec":round(n/dt,1) if dt else None}))
+    print("VERIFIED" if n and not bad else "FAILED"); sys.exit(0 if n and not bad else 2)
 def main():
     p=argparse.ArgumentParser(description="Verify EQ-PROOF proof (offline)")
-    p.add_argument("proof_json"); p.add_argument("--algo", choices=["auto","ed25519","hmac"], default="auto")
-    p.add_argument("--pubkey", default=None); p.add_argument("--hmac-key", default="DEMO_KEY"); args=p.parse_args()
-    att=json.load(open(args.proof_json))
-    ok=False
-    if args.algo in ("auto","ed25519"): ok = verify_ed25519(att, args.pubkey) or ok
-    if args.algo in ("auto","hmac"): ok = verify_hmac(att, args.hmac_key) or ok
+    p.add_argument("proof_json", nargs="?"); p.add_argument("--algo", choices=["auto","ed25519","hmac"], default="auto")
+    p.add_argument("--pubkey", default=None); p.add_argument("--hmac-key", default="DEMO_KEY")
+    p.add_argument("--batch", default=None, help="signed batch headers (JSON or JSONL); proofs carrying a Merkle path are checked against them")
+    p.add_argument("--line", type=int, default=None, help="read record N (0-based) of a JSONL or .eqpb proofs file")
+    p.add_argument("--bulk", default=None, help="DIR | GLOB | JSONL | EQPB: verify many proofs, print failures and a JSON summary")
+    p.add_argument("--jobs", type=int, default=os.cpu_count() or 1); p.add_argument("--processes", action="store_true", help="--bulk on a process pool instead of threads")
+    args=p.parse_args()
+    if not (args.proof_json or args.bulk): p.error("proof_json or --bulk is required")
+    # without --batch, batch headers stored in .eqpb packs are used
+    headers=_load_headers(args.batch) if args.batch else [h for path in (_bulk_paths(args.bulk) if args.bulk else [args.proof_json]) if path.endswith(".eqpb") for h in _pack_headers(path)]
+    verifier=Verifier(args.algo, args.pubkey, args.hmac_key, headers)
+    if args.bulk: return _run_bulk(args, verifier)
+    att=_load(args.proof_json, args.line)
+    ok = isinstance(att, dict) and ("batch" not in att or bool(headers)) and verifier.check_raw([(args.proof_json, att)])[0][1]
     print("VERIFIED" if ok else "FAILED"); sys.exit(0 if ok else 2)
 if __name__=="__main__": main()